@@ -0,0 +1,338 @@
+"""
+A* search
+https://www.wikiwand.com/en/A*_search_algorithm
+
+ALT: A*, Landmarks and Triangle inequality
+(Goldberg and Harrelson, Computing the shortest path: A* search meets graph theory)
+
+A* settles nodes by distance from s plus a lower bound on the distance
+to t, so with a good bound it heads straight to t. ALT precomputes, for a
+few landmarks L, the distances from and to every node; then by the
+triangle inequality
+    d(v, t) >= d(L, t) - d(L, v)    and    d(v, t) >= d(v, L) - d(t, L)
+for every landmark, and the biggest of these bounds is a consistent
+heuristic that is cheap to evaluate for any t.
+"""
+
+import struct
+import zlib
+from array import array
+from random import randrange
+
+from dijkstra_distances import dijkstra, neighbours
+from heap import Heap
+import search_stats
+from shortest_path import node_numbers, path_to, to_labels
+
+
+INF = float("+inf")
+
+
+def a_star(g, s, t, heuristic, queue=Heap, count_settled=False, stats=None):
+    """
+    arguments:
+        g: csr_graph.Graph, or adjacency list of dijkstra_distances.AdjEdge chains,
+            searched as they are: nothing is converted per query
+        s: starting node
+        t: destination node
+        heuristic: function of a node number, a consistent lower bound
+            on its distance to t (INF if t is unreachable from it)
+        queue: priority queue class (see heap.PriorityQueue)
+        count_settled: also return the number of nodes settled
+        stats: search_stats.SearchStats to count the search into,
+            None uses the one of search_stats.collecting(), if any
+
+    returns:
+        d: length of the shortest path from s to t, None if unreachable
+        p: list of nodes of a shortest path, from s to t included
+        settled: number of nodes settled by the search, if count_settled
+    """
+    stats, queue = search_stats.begin(stats, queue)
+    s, t = node_numbers(g, s, t)
+    d, p, settled = _a_star(g, s, t, heuristic, queue, stats)
+    return (d, p, settled) if count_settled else (d, p)
+
+
+def _a_star(g, s, t, heuristic, queue, stats):
+    """
+    arguments:
+        queue, stats: as returned by search_stats.begin()
+
+    returns:
+        d, p: see a_star()
+        settled: number of nodes settled by the search
+    """
+    out = neighbours(g)
+
+    with search_stats.phase(stats, "search"):
+        heap = queue()
+        heap.insert(name=s, value=heuristic(s))
+        distances = {s: 0}
+        parent = {s: None}
+        settled = set()
+        relaxed = 0
+
+        while len(heap) > 0:
+            _, u = heap.pop()
+            settled.add(u)
+            if u == t:
+                break
+
+            dist_u = distances[u]
+            for length, v in out(u):
+                if v in settled:
+                    continue
+                relaxed += 1
+                candidate = dist_u + length
+                if v not in distances or candidate < distances[v]:
+                    h = heuristic(v)
+                    if h == INF:
+                        # t can't be reached through v
+                        continue
+                    distances[v] = candidate
+                    parent[v] = u
+                    heap[v] = candidate + h
+
+    search_stats.count(stats, len(settled), relaxed)
+    if t not in settled:
+        return None, None, len(settled)
+    with search_stats.phase(stats, "path"):
+        return distances[t], to_labels(g, path_to(parent, t)[::-1]), len(settled)
+
+
+class ALT:
+    """
+    landmark distance tables of a static graph, answering
+    point-to-point queries with A* and the landmark lower bounds
+    """
+
+    class LandmarksFileException(Exception):
+        def __init__(self, path, reason):
+            super().__init__(f"{path}: {reason}")
+
+    # magic, landmarks count, nodes count, edges count, graph checksum
+    HEADER = struct.Struct("<4sQQQI")
+    MAGIC = b"ALT2"
+
+    def __init__(self, g, k=8, landmarks=None, tables=None, queue=Heap):
+        """
+        arguments:
+            g: csr_graph.Graph
+            k: number of landmarks, when landmarks is not given
+            landmarks: list of landmark nodes, None picks k of them
+                with select_landmarks()
+            tables: precomputed distances, see load()
+            queue: priority queue class (see heap.PriorityQueue)
+        """
+        self.g = g
+        self.queue = queue
+        n = len(g)
+
+        if landmarks is None:
+            landmarks = ALT.select_landmarks(g, k)
+        self.landmarks = landmarks
+
+        if tables is None:
+            # from the landmarks, then to the landmarks (on the reverse graph),
+            # as one flat array('d'), INF meaning unreachable
+            reverse = g.reverse()
+            tables = array("d")
+            for graph in [g, reverse]:
+                for landmark in landmarks:
+                    tables.extend(
+                        INF if d is None else d for d in dijkstra(graph, landmark)
+                    )
+        assert len(tables) == 2 * len(landmarks) * n
+        self.tables = tables
+
+        # query statistics
+        self.stats = {"queries": 0, "settled": 0}
+
+    @staticmethod
+    def select_landmarks(g, k):
+        """
+        farthest-point selection: every new landmark is the node
+        farthest from the landmarks picked so far
+
+        returns:
+            list of at most k landmark nodes
+        """
+        n = len(g)
+        if n == 0 or k == 0:
+            return []
+
+        # the first landmark is the node farthest from a random one
+        closest = [INF for _ in range(n)]
+        origin = randrange(n)
+        landmarks = []
+        distances = dijkstra(g, origin)
+        while len(landmarks) < k:
+            candidates = [
+                (d, v) for v, d in enumerate(closest if landmarks else distances)
+                if d is not None and v not in landmarks
+            ]
+            if not candidates:
+                break
+            landmark = max(candidates)[1]
+            landmarks.append(landmark)
+            for v, d in enumerate(dijkstra(g, landmark)):
+                if d is not None and d < closest[v]:
+                    closest[v] = d
+        return landmarks
+
+    def heuristic(self, t):
+        """
+        returns:
+            h: function, h(v) is the best landmark lower bound on d(v, t)
+        """
+        n, k, tables = len(self.g), len(self.landmarks), self.tables
+        bounds = []
+        for i in range(k):
+            from_row, to_row = i * n, (k + i) * n
+            bounds.append((from_row, tables[from_row + t], to_row, tables[to_row + t]))
+
+        def h(v):
+            best = 0
+            for from_row, from_t, to_row, to_t in bounds:
+                # d(L, t) - d(L, v), no information if v is unreachable from L
+                from_v = tables[from_row + v]
+                if from_v != INF and from_t - from_v > best:
+                    best = from_t - from_v
+                # d(v, L) - d(t, L), no information if L is unreachable from t
+                if to_t != INF and tables[to_row + v] - to_t > best:
+                    best = tables[to_row + v] - to_t
+            return best
+
+        return h
+
+    def query(self, s, t, stats=None):
+        """
+        arguments:
+            stats: see a_star()
+
+        returns:
+            d, p: see a_star()
+        """
+        stats, queue = search_stats.begin(stats, self.queue)
+        s, t = node_numbers(self.g, s, t)
+        with search_stats.phase(stats, "setup"):
+            heuristic = self.heuristic(t)
+        d, p, settled = _a_star(self.g, s, t, heuristic, queue, stats)
+        self.stats["queries"] += 1
+        self.stats["settled"] += settled
+        return d, p
+
+    def save(self, path):
+        """
+        writes the landmarks and their distance tables to path
+        """
+        with open(path, "wb") as f:
+            f.write(ALT.HEADER.pack(
+                ALT.MAGIC, len(self.landmarks), len(self.g), self.g.edges_count(),
+                ALT.checksum(self.g),
+            ))
+            array("q", self.landmarks).tofile(f)
+            self.tables.tofile(f)
+
+    @staticmethod
+    def checksum(g):
+        """
+        returns:
+            CRC-32 of the offsets, targets and weights arrays of g
+        """
+        crc = 0
+        for column in [g.offsets, g.targets, g.weights]:
+            crc = zlib.crc32(memoryview(column).cast("B"), crc)
+        return crc
+
+    @staticmethod
+    def load(g, path, queue=Heap):
+        """
+        returns:
+            the ALT saved to path by save(), for the same graph g
+        """
+        with open(path, "rb") as f:
+            header = f.read(ALT.HEADER.size)
+            if len(header) < ALT.HEADER.size:
+                raise ALT.LandmarksFileException(path, "truncated header")
+            magic, k, n, m, checksum = ALT.HEADER.unpack(header)
+            if magic != ALT.MAGIC:
+                raise ALT.LandmarksFileException(path, "not a landmarks file")
+            if (n, m, checksum) != (len(g), g.edges_count(), ALT.checksum(g)):
+                raise ALT.LandmarksFileException(path, "computed for another graph")
+            landmarks, tables = array("q"), array("d")
+            try:
+                landmarks.fromfile(f, k)
+                tables.fromfile(f, 2 * k * n)
+            except EOFError:
+                raise ALT.LandmarksFileException(path, "truncated tables")
+        return ALT(g, landmarks=list(landmarks), tables=tables, queue=queue)
+
+
+if __name__ == "__main__":
+    from os import path
+    from random import randint
+    from tempfile import TemporaryDirectory
+
+    from csr_graph import Graph
+    from dijkstra_benchmark import grid_graph, random_edges
+    from graph_file import load_graph, write_graph
+
+    for _ in range(100):
+        n = randint(1, 40)
+        edges = random_edges(n, randint(0, 4 * n), integer=n % 2 == 1)
+        g = Graph.from_edges(edges, n=n)
+        alt = ALT(g, k=randint(0, 4))
+        s = randint(0, n - 1)
+        distances = dijkstra(g, s)
+
+        for t in range(n):
+            d, p = alt.query(s, t)
+            zero = a_star(g, s, t, heuristic=lambda v: 0)
+            if distances[t] is None:
+                assert d is None and p is None and zero == (None, None)
+            else:
+                assert abs(d - distances[t]) < 1e-9 and abs(zero[0] - d) < 1e-9
+                assert p[0] == s and p[-1] == t
+        assert alt.stats["queries"] == n
+
+    # a grid, where landmarks pay off
+    grid = grid_graph(20, max_length=10)
+    g = Graph.from_adj_edges(grid)
+    alt = ALT(g, k=4)
+
+    settled_dijkstra = 0
+    for _ in range(50):
+        s, t = randint(0, len(g) - 1), randint(0, len(g) - 1)
+        d, _ = alt.query(s, t)
+        d_dijkstra, _, settled = a_star(g, s, t, lambda v: 0, count_settled=True)
+        settled_dijkstra += settled
+        assert d == d_dijkstra == a_star(grid, s, t, alt.heuristic(t))[0]
+    assert alt.stats["settled"] < settled_dijkstra
+    print(f"settled per query: ALT {alt.stats['settled'] / 50}, Dijkstra {settled_dijkstra / 50}")
+
+    with TemporaryDirectory() as directory:
+        landmarks_path = path.join(directory, "landmarks")
+        alt.save(landmarks_path)
+        loaded = ALT.load(g, landmarks_path)
+        assert loaded.landmarks == alt.landmarks and loaded.tables == alt.tables
+        assert loaded.query(0, len(g) - 1) == alt.query(0, len(g) - 1)
+
+        # another graph, or the same shape with one length changed
+        edges = list(g.edges())
+        u, v, w = edges[0]
+        for other in [edges[1:], [(u, v, w + 1)] + edges[1:]]:
+            try:
+                ALT.load(Graph.from_edges(other, n=len(g)), landmarks_path)
+                assert False is True
+            except ALT.LandmarksFileException:
+                pass
+
+        # a memory-mapped copy of the graph has the same checksum
+        graph_path = path.join(directory, "graph")
+        write_graph(g, graph_path)
+        mapped = load_graph(graph_path)
+        assert ALT.checksum(mapped) == ALT.checksum(g)
+        assert ALT.load(mapped, landmarks_path).tables == alt.tables
+
+    print("all tests successful")
@@ -0,0 +1,58 @@
+"""
+ALT benchmark
+
+Answers random s -> t queries on random and grid graphs with
+early-exit Dijkstra (A* with a zero heuristic) and with ALT
+for a few landmark counts, reporting nodes settled and time per query.
+
+usage:
+    python3 alt_benchmark.py [n] [queries]
+"""
+
+from random import randint, seed
+from sys import argv
+from time import perf_counter
+
+from alt import ALT, a_star
+from csr_graph import Graph
+from dijkstra_benchmark import grid_graph, random_graph
+
+
+if __name__ == "__main__":
+    n = int(argv[1]) if len(argv) > 1 else 2_000
+    queries = int(argv[2]) if len(argv) > 2 else 100
+
+    seed(0)
+    side = int(n ** 0.5)
+    graphs = [
+        (f"random n={n} m={4 * n}", Graph.from_adj_edges(random_graph(n, 4 * n))),
+        (f"grid {side}x{side}", Graph.from_adj_edges(grid_graph(side))),
+    ]
+
+    for graph_name, g in graphs:
+        print(graph_name)
+        pairs = [(randint(0, len(g) - 1), randint(0, len(g) - 1)) for _ in range(queries)]
+
+        expected, settled = [], 0
+        start = perf_counter()
+        for s, t in pairs:
+            d, _, count = a_star(g, s, t, lambda v: 0, count_settled=True)
+            expected.append(d)
+            settled += count
+        elapsed = perf_counter() - start
+        print(f"{'Dijkstra':>12}: {settled / queries:8.1f} settled, {elapsed / queries * 1e3:.3f}ms per query")
+
+        for k in [1, 4, 16]:
+            start = perf_counter()
+            alt = ALT(g, k=k)
+            preprocessing = perf_counter() - start
+
+            start = perf_counter()
+            distances = [alt.query(s, t)[0] for s, t in pairs]
+            elapsed = perf_counter() - start
+            assert distances == expected
+            print(
+                f"{f'ALT k={k}':>12}: {alt.stats['settled'] / queries:8.1f} settled, "
+                f"{elapsed / queries * 1e3:.3f}ms per query "
+                f"({preprocessing:.2f}s preprocessing)"
+            )
@@ -0,0 +1,141 @@
+"""
+Batch single-source shortest paths
+
+Independent dijkstra runs from many sources, spread over a pool of
+worker processes. The graph is written once to a graph_file and every
+worker memory-maps it when it starts: the pages are shared through the
+page cache and nothing about the graph is pickled per task.
+Every run comes back as one array('d') row, INF meaning unreachable.
+"""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count, path
+from tempfile import TemporaryDirectory
+
+from csr_graph import Graph
+from dijkstra_distances import dijkstra
+from graph_file import load_graph, write_graph
+from heap import Heap
+
+
+INF = float("+inf")
+
+
+def batch_dijkstra(g, sources, workers=None, queue=Heap):
+    """
+    arguments:
+        g: csr_graph.Graph, adjacency list of dijkstra_distances.AdjEdge chains,
+            or path of a graph file written by graph_file.write_graph
+        sources: iterable of starting nodes (labels if the graph has names)
+        workers: number of worker processes, None uses every core
+        queue: priority queue class (see heap.PriorityQueue)
+
+    returns:
+        generator of (source, row) pairs in the order of sources,
+        row[z] is the length of the shortest path from source to z
+    """
+    workers = workers or cpu_count() or 1
+    sources = list(sources)
+
+    if isinstance(g, str):
+        graph_path, g = g, None
+    elif not isinstance(g, Graph):
+        g = Graph.from_adj_edges(g)
+
+    if workers == 1 or len(sources) < 2:
+        # in this process the graph stays local: the globals of
+        # _init_worker are only for worker processes
+        if g is None:
+            g = load_graph(graph_path)
+        for s in sources:
+            yield s, _distances_row(g, s, queue)
+        return
+
+    with TemporaryDirectory() as directory:
+        if g is not None:
+            graph_path = path.join(directory, "graph.csrg")
+            write_graph(g, graph_path)
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(graph_path, queue)
+        ) as pool:
+            chunksize = max(1, len(sources) // (4 * workers))
+            yield from zip(sources, pool.map(_row, sources, chunksize=chunksize))
+
+
+# graph and queue of the current worker process, see _init_worker
+_graph = _queue = None
+
+
+def _init_worker(graph_path, queue):
+    """
+    arguments:
+        graph_path: graph file to memory-map
+    """
+    global _graph, _queue
+    _graph = load_graph(graph_path)
+    _queue = queue
+
+
+def _row(s):
+    return _distances_row(_graph, s, _queue)
+
+
+def _distances_row(g, s, queue):
+    if g.index is not None:
+        s = g.index[s]
+    return array("d", (INF if d is None else d for d in dijkstra(g, s, queue=queue)))
+
+
+if __name__ == "__main__":
+    from random import randint
+
+    from dijkstra_benchmark import random_edges
+    from dijkstra_distances import AdjEdge
+    from pairing_heap import PairingHeap
+
+    def expected_row(g, s):
+        return [INF if d is None else d for d in dijkstra(g, s)]
+
+    for workers in [1, 2, 3]:
+        n = randint(1, 60)
+        edges = random_edges(n, randint(0, 4 * n), integer=workers % 2 == 1)
+        g = Graph.from_edges(edges, n=n)
+        sources = [randint(0, n - 1) for _ in range(randint(0, 20))]
+
+        rows = list(batch_dijkstra(g, sources, workers=workers))
+        assert [s for s, _ in rows] == sources
+        for s, row in rows:
+            assert isinstance(row, array) and row.typecode == "d"
+            assert list(row) == expected_row(g, s)
+
+        for s, row in batch_dijkstra(g, sources[:3], workers=workers, queue=PairingHeap):
+            assert list(row) == expected_row(g, s)
+
+        with TemporaryDirectory() as directory:
+            graph_path = path.join(directory, "graph.csrg")
+            write_graph(g, graph_path)
+            for s, row in batch_dijkstra(graph_path, sources, workers=workers):
+                assert list(row) == expected_row(g, s)
+
+    g = Graph.from_dict({"a": {"b": 1, "c": 4}, "b": {"c": 2}, "c": {}})
+    assert [list(row) for _, row in batch_dijkstra(g, ["a", "c"], workers=2)] == [
+        [0, 1, 3], [INF, INF, 0]
+    ]
+
+    adj = [AdjEdge((1, 1), AdjEdge((5, 2), None)), AdjEdge((1, 2), None), None]
+    assert [list(row) for _, row in batch_dijkstra(adj, [0, 1], workers=2)] == [
+        [0, 1, 2], [INF, 0, 1]
+    ]
+
+    assert list(batch_dijkstra(g, [], workers=2)) == []
+
+    # interleaved in-process generators keep their own graph
+    g1 = Graph.from_edges([(0, 1, 1)])
+    g2 = Graph.from_edges([(0, 1, 100)])
+    rows = zip(batch_dijkstra(g1, [0, 0], workers=1), batch_dijkstra(g2, [0, 0], workers=1))
+    for (_, row1), (_, row2) in rows:
+        assert list(row1) == [0, 1] and list(row2) == [0, 100]
+
+    print("all tests successful")
@@ -5,18 +5,24 @@ Dijkstra breaks if there are negative weights.
 Dijkstra is greedy, Bellman-Ford is dynamic.
 """
 
+from csr_graph import Graph
+
 
 def bellman_ford(g, s, t):
     """
     arguments:
         g: directed graph, dict
             g[a][b] will be the cost of the edge a -> b
+            or csr_graph.Graph
         s: starting node
         t: destination node
 
     returns:
         d: lenght of shortest path from s to t
     """
+    if isinstance(g, Graph):
+        return _bellman_ford_csr(g, s, t)
+
     # mem[i][v] will be the minimum cost of a path
     # from node v to node t having at most i edges
     mem = [{v: None for v in g} for _ in range(len(g))]
@@ -34,6 +40,34 @@ def bellman_ford(g, s, t):
     return mem[len(g) - 1][s]
 
 
+def _bellman_ford_csr(g, s, t):
+    """
+    bellman_ford over the arrays of a csr_graph.Graph, keeping only
+    the last two rows of the table, O(n) memory and O(n * m) time
+    """
+    if g.index is not None:
+        s, t = g.index[s], g.index[t]
+    offsets, targets, weights = g.offsets, g.targets, g.weights
+
+    # prev[v] will be the minimum cost of a path
+    # from node v to node t having at most i - 1 edges
+    prev = [float("+inf") for _ in range(len(g))]
+    prev[t] = 0
+
+    for _ in range(1, len(g)):
+        row = list(prev)
+        for v in range(len(g)):
+            for e in range(offsets[v], offsets[v + 1]):
+                cost = weights[e] + prev[targets[e]]
+                if cost < row[v]:
+                    row[v] = cost
+        if row == prev:
+            break
+        prev = row
+
+    return prev[s]
+
+
 if __name__ == "__main__":
     g = {
         "a": {"u": 2, "b": 1},
@@ -54,5 +88,17 @@ if __name__ == "__main__":
     }
     d = bellman_ford(g, "a", "b")
     assert d == 0
+    assert bellman_ford(Graph.from_dict(g), "a", "b") == 0
+
+    from random import randint
+
+    for _ in range(50):
+        n = randint(1, 15)
+        g = {v: {} for v in range(n)}
+        for _ in range(randint(0, 40)):
+            g[randint(0, n - 1)][randint(0, n - 1)] = randint(-3, 10)
+        csr = Graph.from_dict(g)
+        s, t = randint(0, n - 1), randint(0, n - 1)
+        assert bellman_ford(csr, s, t) == bellman_ford(g, s, t)
 
     print("all tests successful")
@@ -1,4 +1,12 @@
-def bisect_right(sorted_list, value, lo=0, hi=None, key=lambda item: item):
+"""
+Binary search
+https://www.wikiwand.com/en/Binary_search_algorithm
+"""
+
+from heapsort import heapsorted as sorted
+
+
+def bisect_right(sorted_list, value, lo=0, hi=None, key=None, keys=None):
     """
     Returns the rightmost (largest) index where to insert the item in the list,
     assuming the list is sorted.
@@ -6,24 +14,92 @@ def bisect_right(sorted_list, value, lo=0, hi=None, key=lambda item: item):
     Optional args lo (default 0) and hi (default len(sorted_list))
     bound the slice of the list to be searched.
 
-    Optional arg key is a lambda function used to evaluate the list items
+    Optional arg key is a function used to evaluate the list items
     (and not for the passed value to insert).
+
+    Optional arg keys is the precomputed list of key(item) for every item,
+    searched instead of sorted_list so that key is never called.
     """
+    if keys is not None:
+        sorted_list, key = keys, None
     if hi is None:
         hi = len(sorted_list)
 
     assert hi >= lo
 
-    if lo == hi:
-        return lo
-    elif hi == lo + 1:
-        return hi if key(sorted_list[lo]) <= value else lo
-    else:
-        mid = lo + ((hi - lo) // 2)
-        if key(sorted_list[mid]) <= value:
-            return bisect_right(sorted_list, value, lo=mid, hi=hi, key=key)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        item = sorted_list[mid] if key is None else key(sorted_list[mid])
+        if value < item:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def bisect_left(sorted_list, value, lo=0, hi=None, key=None, keys=None):
+    """
+    Returns the leftmost (smallest) index where to insert the item in the list,
+    assuming the list is sorted.
+
+    Optional args as in bisect_right.
+    """
+    if keys is not None:
+        sorted_list, key = keys, None
+    if hi is None:
+        hi = len(sorted_list)
+
+    assert hi >= lo
+
+    while lo < hi:
+        mid = (lo + hi) // 2
+        item = sorted_list[mid] if key is None else key(sorted_list[mid])
+        if item < value:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def bisect_many(sorted_keys, queries, right=True):
+    """
+    Answers a sorted batch of queries with a single merge-walk, O(n + q).
+
+    arguments:
+        sorted_keys: sorted list of keys
+        queries: sorted list of values
+        right: bisect_right semantics if True, bisect_left otherwise
+
+    returns:
+        list, i-th item is the insertion index of queries[i]
+    """
+    n = len(sorted_keys)
+    result = []
+    i = 0
+    for value in queries:
+        if right:
+            while i < n and not value < sorted_keys[i]:
+                i += 1
         else:
-            return bisect_right(sorted_list, value, lo=lo, hi=mid, key=key)
+            while i < n and sorted_keys[i] < value:
+                i += 1
+        result.append(i)
+    return result
+
+
+def bisect_batch(sorted_keys, queries, right=True):
+    """
+    Answers an unsorted batch of queries: they are sorted once,
+    answered with bisect_many and put back in their order, O(n + q log q).
+
+    arguments and returns as in bisect_many
+    """
+    order = sorted(range(len(queries)), key=queries.__getitem__)
+    answers = bisect_many(sorted_keys, [queries[i] for i in order], right=right)
+    result = [None for _ in range(len(queries))]
+    for i, answer in zip(order, answers):
+        result[i] = answer
+    return result
 
 
 if __name__ == "__main__":
@@ -51,4 +127,33 @@ if __name__ == "__main__":
         == bisect_right(l, a, lo=1, hi=len(l) - 1)
     )
 
+    from bisect import bisect_left as py_bisect_left
+    from random import randint
+
+    for _ in range(100):
+        keys = [randint(-20, 20) for _ in range(randint(0, 50))]
+        keys.sort()
+        tasks = [(None, k) for k in keys]
+        queries = [randint(-25, 25) for _ in range(randint(0, 50))]
+
+        for q in queries:
+            lo = randint(0, len(keys))
+            hi = randint(lo, len(keys))
+            assert bisect_right(keys, q, lo, hi) == py_bisect_right(keys, q, lo, hi)
+            assert bisect_left(keys, q, lo, hi) == py_bisect_left(keys, q, lo, hi)
+            assert bisect_right(tasks, q, key=lambda t: t[1]) == py_bisect_right(keys, q)
+            assert bisect_left(tasks, q, keys=keys) == py_bisect_left(keys, q)
+
+        assert bisect_batch(keys, queries) == [py_bisect_right(keys, q) for q in queries]
+        assert bisect_batch(keys, queries, right=False) == [py_bisect_left(keys, q) for q in queries]
+
+        queries.sort()
+        assert bisect_many(keys, queries) == [py_bisect_right(keys, q) for q in queries]
+        assert bisect_many(keys, queries, right=False) == [py_bisect_left(keys, q) for q in queries]
+
+    # any comparable keys, e.g. tuples and strings
+    keys = [(1, "b"), (2, "a"), (2, "c")]
+    assert bisect_batch(keys, [(2, "b"), (0, "z"), (2, "c")]) == [2, 0, 3]
+    assert bisect_batch(["ab", "b", "ba"], ["b", "a", "c"], right=False) == [1, 0, 3]
+
     print("all tests successful")
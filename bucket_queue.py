@@ -0,0 +1,151 @@
+"""
+Bucket queue
+https://www.wikiwand.com/en/Bucket_queue
+
+Dial's algorithm: Dijkstra with integer edge lengths at most C only ever
+holds keys between the last popped key d and d + C, so C + 1 buckets
+used as a circular array, bucket k % (C + 1) holding the items with
+key k, sort them with no comparisons at all: pop() walks forward from
+the last popped key to the first non-empty bucket, O(E + V * C) overall.
+"""
+
+from heap import Heap
+
+
+class BucketQueue:
+    """
+    name-value monotone min-queue for non-negative integer keys that stay
+    within max_gap of the last popped one, same interface as heap.Heap
+    (see heap.PriorityQueue)
+    """
+
+    def __init__(self, max_size=None, key=lambda item: item, max_gap=0):
+        """
+        arguments:
+            max_size: maximum number of items the queue can hold,
+                None (default) lets the queue grow as needed
+            key: function applied to values, must return integers
+                between the key of the last popped item and that plus max_gap
+            max_gap: maximum key distance from the last popped item,
+                e.g. the longest edge in Dijkstra
+        """
+        self.__max_size = max_size
+
+        # key of the last popped item, a lower bound on all keys
+        self.__last = 0
+
+        # self.__buckets[k % len(self.__buckets)][name] will be the value of
+        # the item with that name and key k
+        self.__buckets = [{} for _ in range(max_gap + 1)]
+
+        # self.__keys[name] will be the key of the item with that name
+        self.__keys = {}
+
+        self.__key = key
+
+    def __contains__(self, name):
+        return name in self.__keys
+
+    def __getitem__(self, name):
+        if len(self.__keys) == 0:
+            raise IndexError("empty queue")
+        elif name not in self:
+            raise KeyError(name)
+        else:
+            return self.__buckets[self.__keys[name] % len(self.__buckets)][name]
+
+    def __len__(self):
+        return len(self.__keys)
+
+    def __str__(self):
+        return f"{[(v, name) for bucket in self.__buckets for name, v in bucket.items()]}"
+
+    def __setitem__(self, name, value):
+        k = self.__key(value)
+        assert isinstance(k, int) and self.__last <= k <= self.__last + len(self.__buckets) - 1, \
+            "key out of the window"
+        if name not in self.__keys:
+            if len(self.__keys) == self.__max_size:
+                raise Heap.FullHeapException
+        else:
+            del self.__buckets[self.__keys[name] % len(self.__buckets)][name]
+        self.__buckets[k % len(self.__buckets)][name] = value
+        self.__keys[name] = k
+
+    def insert(self, name, value):
+        assert name not in self
+        self[name] = value
+
+    def update(self, name, value):
+        assert name in self
+        self[name] = value
+
+    def __first_key(self):
+        k = self.__last
+        while not self.__buckets[k % len(self.__buckets)]:
+            k += 1
+        return k
+
+    def get_root(self):
+        if len(self.__keys) == 0:
+            raise IndexError("pop from empty queue")
+        else:
+            bucket = self.__buckets[self.__first_key() % len(self.__buckets)]
+            name = next(iter(bucket))
+            return (bucket[name], name)
+
+    def pop(self):
+        if len(self.__keys) == 0:
+            raise IndexError("pop from empty queue")
+
+        self.__last = self.__first_key()
+        name, value = self.__buckets[self.__last % len(self.__buckets)].popitem()
+        del self.__keys[name]
+        return (value, name)
+
+
+if __name__ == "__main__":
+    from random import randint
+
+    for _ in range(20):
+        gap = randint(0, 50)
+        h = BucketQueue(max_gap=gap)
+        values = {}
+        last = 0
+        for name in range(300):
+            values[name] = randint(0, gap)
+            h.insert(name=name, value=values[name])
+        for _ in range(600):
+            name = randint(0, 299)
+            if name in h and randint(0, 1):
+                # decrease-key, never below the last popped key
+                values[name] = randint(last, values[name])
+                h.update(name=name, value=values[name])
+            elif name not in h and randint(0, 1):
+                values[name] = randint(last, last + gap)
+                h.insert(name=name, value=values[name])
+            elif len(h) > 0:
+                assert h.get_root()[0] == min(values.values())
+                last, name = h.pop()
+                assert last == values.pop(name)
+        popped = [h.pop()[0] for _ in range(len(values))]
+        assert popped == sorted(values.values())
+
+    h = BucketQueue(key=lambda task: task[1], max_gap=20)
+    h["a"], h["b"] = (0, 14), (16, 12)
+    assert h.pop() == ((16, 12), "b")
+    try:
+        h["c"] = (0, 33)
+        in_window = True
+    except AssertionError:
+        in_window = False
+    assert not in_window
+    assert h["a"] == (0, 14)
+
+    try:
+        BucketQueue().pop()
+        assert False is True
+    except IndexError:
+        pass
+
+    print("all tests successful")
@@ -0,0 +1,313 @@
+"""
+Thread-safe and asyncio priority queues on top of heap.Heap
+
+Producer-consumer queue
+https://www.wikiwand.com/en/Producer%E2%80%93consumer_problem
+
+Both queues keep heap.Heap's indexed semantics:
+assigning to a name already in the queue updates its value (decrease-key).
+Batched push_many/pop_many take the lock once per batch, not once per item.
+"""
+
+import asyncio
+from collections import deque
+from threading import Condition
+from time import monotonic
+
+from heap import Heap
+
+
+class ConcurrentHeap:
+    """
+    name-value min-heap safe to share between threads,
+    pop() can block until an item is available
+    """
+
+    def __init__(self, max_size=None, key=lambda item: item):
+        """
+        arguments:
+            max_size, key: see heap.Heap
+        """
+        self.__heap = Heap(max_size=max_size, key=key)
+        self.__not_empty = Condition()
+
+    def __contains__(self, name):
+        with self.__not_empty:
+            return name in self.__heap
+
+    def __getitem__(self, name):
+        with self.__not_empty:
+            return self.__heap[name]
+
+    def __len__(self):
+        with self.__not_empty:
+            return len(self.__heap)
+
+    def get_root(self):
+        with self.__not_empty:
+            return self.__heap.get_root()
+
+    def __setitem__(self, name, value):
+        with self.__not_empty:
+            self.__heap[name] = value
+            self.__not_empty.notify()
+
+    def insert(self, name, value):
+        with self.__not_empty:
+            self.__heap.insert(name=name, value=value)
+            self.__not_empty.notify()
+
+    def update(self, name, value):
+        with self.__not_empty:
+            self.__heap.update(name=name, value=value)
+
+    def push_many(self, items):
+        """
+        arguments:
+            items: iterable of (name, value) pairs to insert or update,
+                applied under a single lock acquisition
+        """
+        items = list(items)
+        with self.__not_empty:
+            self.__heap.update_many(items)
+            self.__not_empty.notify(len(items))
+
+    def __wait(self, block, timeout):
+        """
+        waits, with the lock held, until the heap is not empty
+
+        raises:
+            IndexError if the heap is still empty when giving up
+        """
+        if block:
+            self.__not_empty.wait_for(lambda: len(self.__heap) > 0, timeout)
+        if len(self.__heap) == 0:
+            raise IndexError("pop from empty heap")
+
+    def pop(self, block=True, timeout=None):
+        """
+        arguments:
+            block: wait for an item if the heap is empty
+            timeout: maximum seconds to wait, None waits forever
+
+        returns:
+            (value, name) of the root
+
+        raises:
+            IndexError if no item arrived in time
+        """
+        with self.__not_empty:
+            self.__wait(block, timeout)
+            return self.__heap.pop()
+
+    def pop_many(self, max_items, block=True, timeout=None):
+        """
+        waits like pop() for the first item, then pops
+        up to max_items without releasing the lock
+
+        returns:
+            list of (value, name) pairs, smallest first
+        """
+        with self.__not_empty:
+            self.__wait(block, timeout)
+            n = min(max_items, len(self.__heap))
+            return [self.__heap.pop() for _ in range(n)]
+
+
+class AsyncHeap:
+    """
+    name-value min-heap for asyncio tasks,
+    await pop() suspends until an item is available
+
+    all methods must be called from the event loop thread,
+    so no lock is needed around the heap itself
+    """
+
+    def __init__(self, max_size=None, key=lambda item: item):
+        """
+        arguments:
+            max_size, key: see heap.Heap
+        """
+        self.__heap = Heap(max_size=max_size, key=key)
+
+        # futures of the consumers suspended in pop(), oldest first
+        self.__waiters = deque()
+
+    def __contains__(self, name):
+        return name in self.__heap
+
+    def __getitem__(self, name):
+        return self.__heap[name]
+
+    def __len__(self):
+        return len(self.__heap)
+
+    def get_root(self):
+        return self.__heap.get_root()
+
+    def __wake(self, n):
+        while n > 0 and self.__waiters:
+            waiter = self.__waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                n -= 1
+
+    def __setitem__(self, name, value):
+        self.__heap[name] = value
+        self.__wake(1)
+
+    def insert(self, name, value):
+        self.__heap.insert(name=name, value=value)
+        self.__wake(1)
+
+    def update(self, name, value):
+        self.__heap.update(name=name, value=value)
+
+    def push_many(self, items):
+        items = list(items)
+        self.__heap.update_many(items)
+        self.__wake(len(items))
+
+    async def __wait(self, timeout):
+        deadline = None if timeout is None else monotonic() + timeout
+        while len(self.__heap) == 0:
+            waiter = asyncio.get_running_loop().create_future()
+            self.__waiters.append(waiter)
+            remaining = None if deadline is None else deadline - monotonic()
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except BaseException as e:
+                # woken but cancelled or timed out before popping: like
+                # asyncio.Queue.get, hand the wakeup to the next waiter
+                woken = waiter.done() and not waiter.cancelled()
+                waiter.cancel()
+                if woken and len(self.__heap) > 0:
+                    self.__wake(1)
+                if isinstance(e, asyncio.TimeoutError):
+                    raise IndexError("pop from empty heap")
+                raise
+
+    async def pop(self, timeout=None):
+        """
+        arguments:
+            timeout: maximum seconds to wait, None waits forever
+
+        returns:
+            (value, name) of the root
+
+        raises:
+            IndexError if no item arrived in time
+        """
+        await self.__wait(timeout)
+        return self.__heap.pop()
+
+    async def pop_many(self, max_items, timeout=None):
+        """
+        waits like pop() for the first item, then pops up to max_items
+
+        returns:
+            list of (value, name) pairs, smallest first
+        """
+        await self.__wait(timeout)
+        n = min(max_items, len(self.__heap))
+        return [self.__heap.pop() for _ in range(n)]
+
+
+if __name__ == "__main__":
+    from random import randint
+    from threading import Thread
+
+    h = ConcurrentHeap()
+    h["a"], h["b"] = 3, 2
+    h.update(name="a", value=1)
+    assert h.get_root() == (1, "a")
+    assert "b" in h and h["b"] == 2 and len(h) == 2
+    assert h.pop_many(5) == [(1, "a"), (2, "b")]
+
+    try:
+        h.pop(timeout=0.01)
+        assert False is True
+    except IndexError:
+        pass
+
+    try:
+        h.pop(block=False)
+        assert False is True
+    except IndexError:
+        pass
+
+    # many producers, many consumers
+    PRODUCERS, CONSUMERS, ITEMS = 4, 3, 2000
+    popped = []
+
+    def produce(p):
+        batch = []
+        for i in range(ITEMS):
+            name = (p, i)
+            if i % 2:
+                h.insert(name=name, value=randint(0, 10 ** 6))
+            else:
+                batch.append((name, randint(0, 10 ** 6)))
+            if len(batch) == 50:
+                h.push_many(batch)
+                batch = []
+        h.push_many(batch)
+
+    def consume():
+        while True:
+            try:
+                items = h.pop_many(64, timeout=0.5)
+            except IndexError:
+                return
+            popped.extend(name for _, name in items)
+
+    threads = [Thread(target=produce, args=(p,)) for p in range(PRODUCERS)]
+    threads += [Thread(target=consume) for _ in range(CONSUMERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(h) == 0
+    assert sorted(popped) == sorted(
+        (p, i) for p in range(PRODUCERS) for i in range(ITEMS)
+    )
+
+    ########################################################
+    async def main():
+        h = AsyncHeap()
+
+        async def consume(n):
+            return [await h.pop() for _ in range(n)]
+
+        consumer = asyncio.create_task(consume(3))
+        await asyncio.sleep(0)
+        h["x"] = 5
+        h.push_many([("y", 1), ("z", 3)])
+        h.update(name="z", value=0)
+        result = await consumer
+        assert sorted(result) == [(0, "z"), (1, "y"), (5, "x")]
+
+        try:
+            await h.pop(timeout=0.01)
+            assert False is True
+        except IndexError:
+            pass
+
+        h.push_many((i, -i) for i in range(10))
+        assert await h.pop_many(3) == [(-9, 9), (-8, 8), (-7, 7)]
+        assert len(h) == 7
+
+        # a consumer cancelled after its wakeup passes the item on
+        h = AsyncHeap()
+        first = asyncio.create_task(h.pop())
+        second = asyncio.create_task(h.pop())
+        await asyncio.sleep(0)
+        h["x"] = 1
+        first.cancel()
+        assert await asyncio.wait_for(second, 1) == (1, "x")
+        assert first.cancelled() and len(h) == 0
+
+    asyncio.run(main())
+
+    print("all tests successful")
@@ -0,0 +1,424 @@
+"""
+Contraction hierarchies
+https://www.wikiwand.com/en/Contraction_hierarchies
+(Geisberger, Sanders, Schultes and Delling, Contraction Hierarchies:
+Faster and Simpler Hierarchical Routing in Road Networks)
+
+Preprocessing contracts the nodes one at a time, least important first.
+Contracting v removes it from the remaining graph: for every pair of
+edges u -> v -> w, a shortcut u -> w of the same length is added unless
+a witness search finds a path from u to w, avoiding v, that is not longer.
+Importance is the edge difference (shortcuts added minus edges removed)
+plus the number of already contracted neighbours, kept up to date lazily.
+
+Every shortest path then goes up the hierarchy and back down, so a query
+is a bidirectional Dijkstra where both sides only follow edges towards
+more important nodes: each side settles a tiny upward search space.
+A shortcut remembers the node it skips, and unpacks into the original path.
+"""
+
+import json
+from array import array
+
+from csr_graph import Graph
+from heap import Heap
+import search_stats
+from shortest_path import path_to, to_labels
+
+
+INF = float("+inf")
+
+# middle node of an edge that is not a shortcut
+ORIGINAL = -1
+
+
+class ContractionHierarchy:
+    """
+    contraction hierarchy of a static csr_graph.Graph
+
+    preprocessing is resumable: contract(steps) contracts at most steps
+    nodes, and save() / load() write and read the state at any point
+    """
+
+    def __init__(self, g, witness_limit=100):
+        """
+        arguments:
+            g: csr_graph.Graph, or adjacency list of dijkstra_distances.AdjEdge chains
+            witness_limit: maximum number of nodes settled by a witness search,
+                when it is reached the shortcut is added anyway
+        """
+        if not isinstance(g, Graph):
+            g = Graph.from_adj_edges(g)
+        n = len(g)
+        self.names = g.names
+        self.index = g.index
+        self.typecode = g.weights_typecode()
+        self.witness_limit = witness_limit
+
+        # out_edges[u][v] == in_edges[v][u] == (length, middle node),
+        # only the shortest of parallel edges is kept
+        self.out_edges = [{} for _ in range(n)]
+        self.in_edges = [{} for _ in range(n)]
+        for u, v, w in g.edges():
+            if u != v and (v not in self.out_edges[u] or w < self.out_edges[u][v][0]):
+                self.out_edges[u][v] = self.in_edges[v][u] = (w, ORIGINAL)
+
+        # rank[v] is the position of v in the contraction order
+        self.rank = [None for _ in range(n)]
+        self.order = []
+        self.contracted_neighbours = [0 for _ in range(n)]
+
+        self.queue = None
+        self.up = self.down = None
+
+    def __len__(self):
+        return len(self.rank)
+
+    def done(self):
+        return len(self.order) == len(self)
+
+    # preprocessing
+
+    def contract(self, steps=None):
+        """
+        contracts at most steps nodes, all the remaining ones if steps is None
+
+        returns:
+            True when every node has been contracted
+        """
+        if self.queue is None:
+            self.queue = Heap.from_items(
+                (v, self.__priority(v)) for v in range(len(self)) if self.rank[v] is None
+            )
+        queue = self.queue
+
+        while len(queue) > 0 and (steps is None or steps > 0):
+            _, v = queue.pop()
+            # lazy update: priorities only grow stale upwards between pops
+            priority = self.__priority(v)
+            if len(queue) > 0 and priority > queue.get_root()[0]:
+                queue.insert(name=v, value=priority)
+                continue
+
+            neighbours = self.__remaining(self.in_edges[v]) | self.__remaining(self.out_edges[v])
+            for u, w, length in self.__shortcuts(v):
+                if w not in self.out_edges[u] or length < self.out_edges[u][w][0]:
+                    self.out_edges[u][w] = self.in_edges[w][u] = (length, v)
+
+            self.rank[v] = len(self.order)
+            self.order.append(v)
+            for u in neighbours:
+                self.contracted_neighbours[u] += 1
+                queue[u] = self.__priority(u)
+            if steps is not None:
+                steps -= 1
+
+        if self.done():
+            self.__build()
+        return self.done()
+
+    def __remaining(self, edges):
+        return {u for u in edges if self.rank[u] is None}
+
+    def __priority(self, v):
+        shortcuts = len(self.__shortcuts(v))
+        removed = len(self.__remaining(self.in_edges[v])) + len(self.__remaining(self.out_edges[v]))
+        return shortcuts - removed + self.contracted_neighbours[v]
+
+    def __shortcuts(self, v):
+        """
+        returns:
+            (u, w, length) shortcuts needed to contract v
+        """
+        rank = self.rank
+        targets = [
+            (w, length) for w, (length, _) in self.out_edges[v].items() if rank[w] is None
+        ]
+        if not targets:
+            return []
+
+        shortcuts = []
+        for u, (in_length, _) in self.in_edges[v].items():
+            if rank[u] is not None:
+                continue
+            limit = in_length + max(length for _, length in targets)
+            witness = self.__witness_search(u, v, limit)
+            for w, out_length in targets:
+                if w != u and witness.get(w, INF) > in_length + out_length:
+                    shortcuts.append((u, w, in_length + out_length))
+        return shortcuts
+
+    def __witness_search(self, s, avoid, limit):
+        """
+        Dijkstra from s over the remaining nodes but avoid,
+        stopping past distance limit or after witness_limit settled nodes
+
+        returns:
+            distances: dict, upper bounds on the distances from s
+        """
+        rank = self.rank
+        heap = Heap()
+        heap.insert(name=s, value=0)
+        distances = {s: 0}
+        settled = 0
+
+        while len(heap) > 0 and settled < self.witness_limit:
+            dist_u, u = heap.pop()
+            if dist_u > limit:
+                break
+            settled += 1
+            for v, (length, _) in self.out_edges[u].items():
+                if v == avoid or rank[v] is not None:
+                    continue
+                dist = dist_u + length
+                if dist < distances.get(v, INF):
+                    distances[v] = dist
+                    heap[v] = dist
+        return distances
+
+    def __build(self):
+        """
+        freezes the hierarchy into two CSR graphs of upward edges:
+        up holds u -> v, down holds v -> u for every edge u -> v to a lower rank;
+        the middle nodes of the shortcuts are in up.middles and down.middles
+        """
+        rank = self.rank
+        n = len(self)
+        self.up = self.__csr(
+            [[(v, w, m) for v, (w, m) in self.out_edges[u].items() if rank[v] > rank[u]]
+             for u in range(n)]
+        )
+        self.down = self.__csr(
+            [[(u, w, m) for u, (w, m) in self.in_edges[v].items() if rank[u] > rank[v]]
+             for v in range(n)]
+        )
+
+    def __csr(self, adjacency):
+        offsets, targets = array("q", [0]), array("q")
+        weights, middles = array(self.typecode), array("q")
+        for edges in adjacency:
+            for v, w, m in edges:
+                targets.append(v)
+                weights.append(w)
+                middles.append(m)
+            offsets.append(len(targets))
+        g = Graph(offsets, targets, weights)
+        g.middles = middles
+        return g
+
+    # queries
+
+    def query(self, s, t, stats=None):
+        """
+        arguments:
+            s: starting node
+            t: destination node
+            (labels if the graph was built with names)
+            stats: search_stats.SearchStats to count the search into,
+                None uses the one of search_stats.collecting(), if any
+
+        returns:
+            d: length of the shortest path from s to t, None if unreachable
+            p: list of nodes of a shortest path, from s to t included
+        """
+        assert self.done(), "contract() the hierarchy first"
+        stats, queue = search_stats.begin(stats, Heap)
+        if self.index is not None:
+            s, t = self.index[s], self.index[t]
+
+        FORWARD, BACKWARD = 0, 1
+        graphs = [self.up, self.down]
+        distances = [{s: 0}, {t: 0}]
+        parents = [{s: None}, {t: None}]
+        heaps = [queue(), queue()]
+        heaps[FORWARD].insert(name=s, value=0)
+        heaps[BACKWARD].insert(name=t, value=0)
+
+        # upward searches can't stop at the first meeting node:
+        # a side is done once its smallest tentative distance reaches best
+        best, meeting_node = INF, None
+        side = BACKWARD
+        settled = relaxed = 0
+        with search_stats.phase(stats, "search"):
+            while True:
+                live = [
+                    i for i in (FORWARD, BACKWARD)
+                    if len(heaps[i]) > 0 and heaps[i].get_root()[0] < best
+                ]
+                if not live:
+                    break
+                side = (1 - side) if (1 - side) in live else side
+                other = 1 - side
+                heap, dist, parent = heaps[side], distances[side], parents[side]
+
+                dist_u, u = heap.pop()
+                settled += 1
+                if u in distances[other] and dist_u + distances[other][u] < best:
+                    best, meeting_node = dist_u + distances[other][u], u
+
+                # no settled set here: every edge out of u is relaxed
+                for length, v in graphs[side].neighbours(u):
+                    relaxed += 1
+                    candidate = dist_u + length
+                    if candidate < dist.get(v, INF):
+                        dist[v] = candidate
+                        parent[v] = u
+                        heap[v] = candidate
+
+        search_stats.count(stats, settled, relaxed)
+        if meeting_node is None:
+            return None, None
+
+        with search_stats.phase(stats, "path"):
+            # up from s to the meeting node, then down to t
+            hierarchy_path = path_to(parents[FORWARD], meeting_node)[::-1]
+            hierarchy_path += path_to(parents[BACKWARD], meeting_node)[1:]
+
+            path = [hierarchy_path[0]]
+            for u, v in zip(hierarchy_path, hierarchy_path[1:]):
+                path += self.unpack(u, v)[1:]
+            return best, to_labels(self, path)
+
+    def unpack(self, u, v):
+        """
+        returns:
+            nodes of the original path behind the edge u -> v, u and v included
+        """
+        path = [u]
+        stack = [v]
+        while stack:
+            v = stack[-1]
+            m = self.__middle(u, v)
+            if m == ORIGINAL:
+                path.append(v)
+                u = stack.pop()
+            else:
+                stack.append(m)
+        return path
+
+    def __middle(self, u, v):
+        if self.rank[u] < self.rank[v]:
+            g, lo, target = self.up, u, v
+        else:
+            g, lo, target = self.down, v, u
+        for e in range(g.offsets[lo], g.offsets[lo + 1]):
+            if g.targets[e] == target:
+                return g.middles[e]
+        raise KeyError((u, v))
+
+    # serialization
+
+    def save(self, path):
+        """
+        writes the hierarchy to path, finished or not
+        """
+        with open(path, "w") as f:
+            json.dump({
+                "n": len(self),
+                "names": self.names,
+                "typecode": self.typecode,
+                "witness_limit": self.witness_limit,
+                "order": self.order,
+                "edges": [
+                    [u, v, w, m] for u in range(len(self))
+                    for v, (w, m) in self.out_edges[u].items()
+                ],
+            }, f)
+
+    @staticmethod
+    def load(path):
+        """
+        returns:
+            the hierarchy saved to path by save(),
+            call contract() to finish its preprocessing
+        """
+        with open(path) as f:
+            state = json.load(f)
+        g = Graph.from_edges([], n=state["n"], names=state["names"], typecode=state["typecode"])
+        ch = ContractionHierarchy(g, witness_limit=state["witness_limit"])
+        for u, v, w, m in state["edges"]:
+            ch.out_edges[u][v] = ch.in_edges[v][u] = (w, m)
+        for v in state["order"]:
+            ch.rank[v] = len(ch.order)
+            ch.order.append(v)
+            for u in ch.in_edges[v].keys() | ch.out_edges[v].keys():
+                if ch.rank[u] is None:
+                    ch.contracted_neighbours[u] += 1
+        if ch.done():
+            ch.__build()
+        return ch
+
+
+if __name__ == "__main__":
+    from os import path
+    from random import randint
+    from tempfile import TemporaryDirectory
+
+    from dijkstra_benchmark import grid_graph, random_edges
+    from dijkstra_distances import AdjEdge, dijkstra
+    from shortest_path import path_length
+
+    for _ in range(100):
+        n = randint(1, 40)
+        integer = randint(0, 3) > 0
+        edges = random_edges(n, randint(0, 4 * n), integer=integer)
+        g = Graph.from_edges(edges, n=n)
+        ch = ContractionHierarchy(g, witness_limit=randint(1, 50))
+        assert ch.contract()
+        assert sorted(ch.order) == list(range(n))
+
+        for s in range(n):
+            distances = dijkstra(g, s)
+            for t in range(n):
+                d, p = ch.query(s, t)
+                if distances[t] is None:
+                    assert d is None and p is None
+                else:
+                    if integer:
+                        assert d == distances[t]
+                    else:
+                        assert abs(d - distances[t]) < 1e-9
+                    assert p[0] == s and p[-1] == t
+                    assert abs(path_length(g, p) - d) < 1e-9
+
+    # resuming, and saving and loading half way through
+    g = Graph.from_adj_edges(grid_graph(12, max_length=10))
+    ch = ContractionHierarchy(g)
+    assert not ch.contract(steps=50) and len(ch.order) == 50
+    with TemporaryDirectory() as directory:
+        ch_path = path.join(directory, "hierarchy.json")
+        ch.save(ch_path)
+        resumed = ContractionHierarchy.load(ch_path)
+        assert resumed.order == ch.order and not resumed.done()
+        assert resumed.contract(steps=30) is False and resumed.contract()
+
+        resumed.save(ch_path)
+        loaded = ContractionHierarchy.load(ch_path)
+        assert loaded.done()
+
+    for s in range(0, len(g), 7):
+        distances = dijkstra(g, s)
+        for t in range(len(g)):
+            assert resumed.query(s, t)[0] == loaded.query(s, t)[0] == distances[t]
+
+    g = Graph.from_dict({
+        "s": {"v1": 1, "v3": 10},
+        "v1": {"v4": 100, "v2": 100},
+        "v2": {"t": 1},
+        "v3": {"v2": 10, "v4": 10},
+        "v4": {"t": 1},
+        "t": {}
+    })
+    ch = ContractionHierarchy(g)
+    ch.contract()
+    d, p = ch.query("s", "t")
+    assert d == 21 and p in (["s", "v3", "v2", "t"], ["s", "v3", "v4", "t"])
+    assert ch.query("t", "s") == (None, None)
+    assert ch.query("v2", "v2") == (0, ["v2"])
+
+    adj = [AdjEdge((1, 1), AdjEdge((5, 2), None)), AdjEdge((1, 2), None), None]
+    ch = ContractionHierarchy(adj)
+    ch.contract()
+    assert ch.query(0, 2) == (2, [0, 1, 2])
+
+    print("all tests successful")
@@ -0,0 +1,179 @@
+"""
+Compressed sparse row (CSR) graph
+https://www.wikiwand.com/en/Sparse_matrix#Compressed_sparse_row_(CSR,_CRS_or_Yale_format)
+
+A directed weighted graph stored as three flat arrays:
+the edges leaving node u are targets[offsets[u]:offsets[u + 1]],
+with lengths weights[offsets[u]:offsets[u + 1]].
+One machine word per offset, target and weight, and no object per edge.
+"""
+
+from array import array
+
+
+class Graph:
+    """
+    directed weighted graph in CSR format, nodes are 0, ..., n - 1
+    """
+
+    def __init__(self, offsets, targets, weights, names=None, buffer=None):
+        """
+        arguments:
+            offsets: array of n + 1 edge offsets, offsets[0] == 0
+            targets: array of the m edge destinations
+            weights: array of the m edge lengths
+            names: optional list, names[u] is the original label of node u
+            buffer: optional object owning the memory of the arrays
+                (e.g. the mmap of a graph file), kept alive with the graph
+        """
+        assert len(offsets) > 0 and offsets[0] == 0
+        assert offsets[-1] == len(targets) == len(weights)
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.names = names
+        self.index = None if names is None else {name: u for u, name in enumerate(names)}
+        self.buffer = buffer
+
+    def weights_typecode(self):
+        """
+        returns:
+            typecode of the lengths, for arrays and memoryviews alike
+        """
+        if isinstance(self.weights, memoryview):
+            return self.weights.format
+        return self.weights.typecode
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def edges_count(self):
+        return len(self.targets)
+
+    def neighbours(self, u):
+        """
+        returns:
+            (length, destination) pairs of the edges leaving u
+        """
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        return zip(self.weights[lo:hi], self.targets[lo:hi])
+
+    def edges(self):
+        """
+        returns:
+            (source, destination, length) triples of all edges
+        """
+        for u in range(len(self)):
+            for e in range(self.offsets[u], self.offsets[u + 1]):
+                yield u, self.targets[e], self.weights[e]
+
+    def reverse(self):
+        """
+        returns:
+            the graph with every edge u -> v turned into v -> u
+        """
+        return Graph.from_edges(
+            ((v, u, w) for u, v, w in self.edges()),
+            n=len(self),
+            names=self.names,
+            typecode=self.weights_typecode(),
+        )
+
+    @staticmethod
+    def from_edges(edges, n=None, names=None, typecode=None):
+        """
+        arguments:
+            edges: iterable of (source, destination, length) triples
+            n: number of nodes, None uses the biggest node + 1
+            names: see Graph()
+            typecode: array typecode of the lengths, None picks
+                "q" if all lengths are integers and "d" otherwise
+
+        returns:
+            graph, built with a counting sort of the edges by source, O(n + m)
+        """
+        sources, targets, weights = array("q"), array("q"), []
+        for u, v, w in edges:
+            sources.append(u)
+            targets.append(v)
+            weights.append(w)
+
+        if n is None:
+            n = max(max(sources, default=-1), max(targets, default=-1)) + 1
+        if typecode is None:
+            typecode = "q" if all(type(w) is int for w in weights) else "d"
+
+        offsets = array("q", bytes(8 * (n + 1)))
+        for u in sources:
+            offsets[u + 1] += 1
+        for u in range(n):
+            offsets[u + 1] += offsets[u]
+
+        m = len(sources)
+        next_slot = array("q", offsets[:n])
+        csr_targets = array("q", bytes(8 * m))
+        csr_weights = array(typecode, bytes(array(typecode).itemsize * m))
+        for u, v, w in zip(sources, targets, weights):
+            e = next_slot[u]
+            csr_targets[e] = v
+            csr_weights[e] = w
+            next_slot[u] = e + 1
+
+        return Graph(offsets, csr_targets, csr_weights, names=names)
+
+    @staticmethod
+    def from_adj_edges(g, typecode=None):
+        """
+        arguments:
+            g: adjacency list of dijkstra_distances.AdjEdge chains
+                holding (length, destination) edges
+        """
+        def edges():
+            for u in range(len(g)):
+                node = g[u]
+                while node:
+                    length, v = node.edge
+                    yield u, v, length
+                    node = node.nxt
+
+        return Graph.from_edges(edges(), n=len(g), typecode=typecode)
+
+    @staticmethod
+    def from_dict(g, typecode=None):
+        """
+        arguments:
+            g: dict of dicts as in dijkstra_paths and bellman-ford_distance,
+                g[a][b] will be the cost of the edge a -> b
+
+        nodes are numbered in the order of g, see Graph.names and Graph.index
+        """
+        names = list(g)
+        index = {name: u for u, name in enumerate(names)}
+        return Graph.from_edges(
+            ((index[a], index[b], cost) for a in g for b, cost in g[a].items()),
+            n=len(names),
+            names=names,
+            typecode=typecode,
+        )
+
+
+if __name__ == "__main__":
+    g = Graph.from_edges([(0, 1, 3), (2, 0, 1), (0, 2, 5), (1, 2, 2)])
+    assert len(g) == 3 and g.edges_count() == 4
+    assert g.weights.typecode == "q"
+    assert sorted(g.neighbours(0)) == [(3, 1), (5, 2)]
+    assert list(g.neighbours(2)) == [(1, 0)]
+    assert sorted(g.edges()) == [(0, 1, 3), (0, 2, 5), (1, 2, 2), (2, 0, 1)]
+    assert sorted(g.reverse().edges()) == [(0, 2, 1), (1, 0, 3), (2, 0, 5), (2, 1, 2)]
+
+    g = Graph.from_edges([(0, 1, 2.5)], n=4)
+    assert len(g) == 4 and g.weights.typecode == "d"
+    assert list(g.neighbours(3)) == []
+
+    g = Graph.from_dict({"a": {"b": 1, "c": 4}, "b": {"c": 2}, "c": {}})
+    assert g.names == ["a", "b", "c"] and g.index["c"] == 2
+    assert sorted(g.neighbours(g.index["a"])) == [(1, 1), (4, 2)]
+
+    assert len(Graph.from_edges([])) == 0
+
+    print("all tests successful")
@@ -0,0 +1,190 @@
+"""
+d-ary heap
+https://www.wikiwand.com/en/D-ary_heap
+
+A binary heap generalised to d children per node:
+the tree is log_d(n) levels deep, so inserts and decrease-keys
+(which sift up) get cheaper, while pops compare d children per level.
+Small d > 2 (typically 4) also keeps siblings on the same cache lines.
+"""
+
+from heap import Heap
+
+
+class DaryHeap:
+    """
+    name-value min-heap with d children per node,
+    same interface as heap.Heap (see heap.PriorityQueue)
+    """
+
+    def __init__(self, max_size=None, key=lambda item: item, d=4):
+        """
+        arguments:
+            max_size: maximum number of items the heap can hold,
+                None (default) lets the heap grow as needed
+            key: function applied to values to compare them
+            d: number of children per node
+        """
+        assert d >= 2
+        self.__d = d
+        self.__max_size = max_size
+
+        # parallel columns: cached key, value and name of the ith element
+        self.__keys = []
+        self.__values = []
+        self.__names = []
+
+        # self.__position[name] will be the index of the item with that name
+        self.__position = {}
+
+        self.__key = key
+
+    def __contains__(self, name):
+        return name in self.__position
+
+    def __getitem__(self, name):
+        if len(self.__names) == 0:
+            raise IndexError("empty heap")
+        elif name not in self:
+            raise KeyError(name)
+        else:
+            return self.__values[self.__position[name]]
+
+    def get_root(self):
+        if len(self.__names) == 0:
+            raise IndexError("pop from empty heap")
+        else:
+            return (self.__values[0], self.__names[0])
+
+    def __len__(self):
+        return len(self.__names)
+
+    def __str__(self):
+        return f"{list(zip(self.__values, self.__names))}"
+
+    def __setitem__(self, name, value):
+        if name not in self.__position:
+            if len(self.__names) == self.__max_size:
+                raise Heap.FullHeapException
+            self.__keys.append(None)
+            self.__values.append(None)
+            self.__names.append(None)
+            self.__sift_up(len(self.__names) - 1, self.__key(value), value, name)
+        else:
+            i = self.__position[name]
+            k = self.__key(value)
+            if i > 0 and k < self.__keys[(i - 1) // self.__d]:
+                self.__sift_up(i, k, value, name)
+            else:
+                self.__sift_down(i, k, value, name)
+
+    def insert(self, name, value):
+        assert name not in self
+        self[name] = value
+
+    def update(self, name, value):
+        assert name in self
+        self[name] = value
+
+    def pop(self):
+        if len(self.__names) == 0:
+            raise IndexError("pop from empty heap")
+        else:
+            popped_node_value = self.__values[0]
+            popped_node_name = self.__names[0]
+            del self.__position[popped_node_name]
+
+            last_key = self.__keys.pop()
+            last_value = self.__values.pop()
+            last_name = self.__names.pop()
+            if len(self.__names) > 0:
+                self.__sift_down(0, last_key, last_value, last_name)
+
+            return (popped_node_value, popped_node_name)
+
+    def __sift_up(self, hole, k, value, name):
+        d = self.__d
+        keys, values, names, position = (
+            self.__keys, self.__values, self.__names, self.__position
+        )
+
+        while hole > 0:
+            parent = (hole - 1) // d
+            parent_key = keys[parent]
+            if not k < parent_key:
+                break
+            keys[hole] = parent_key
+            values[hole] = values[parent]
+            parent_name = names[parent]
+            names[hole] = parent_name
+            position[parent_name] = hole
+            hole = parent
+
+        keys[hole], values[hole], names[hole] = k, value, name
+        position[name] = hole
+
+    def __sift_down(self, hole, k, value, name):
+        d = self.__d
+        keys, values, names, position = (
+            self.__keys, self.__values, self.__names, self.__position
+        )
+        nodes_count = len(names)
+
+        first_child = d * hole + 1
+        while first_child < nodes_count:
+            # smallest of the (up to) d children
+            child, child_key = first_child, keys[first_child]
+            for i in range(first_child + 1, min(first_child + d, nodes_count)):
+                if keys[i] < child_key:
+                    child, child_key = i, keys[i]
+            if not child_key < k:
+                break
+            keys[hole] = child_key
+            values[hole] = values[child]
+            child_name = names[child]
+            names[hole] = child_name
+            position[child_name] = hole
+            hole = child
+            first_child = d * hole + 1
+
+        keys[hole], values[hole], names[hole] = k, value, name
+        position[name] = hole
+
+
+if __name__ == "__main__":
+    from random import randint
+
+    for d in [2, 3, 4, 8]:
+        h = DaryHeap(d=d)
+        values = [randint(-1000, 1000) for _ in range(500)]
+        for name, value in enumerate(values):
+            h.insert(name=name, value=value)
+        for name in range(0, len(values), 3):
+            values[name] = randint(-1000, 1000)
+            h.update(name=name, value=values[name])
+        assert len(h) == len(values)
+        assert h[7] == values[7]
+        assert h.get_root()[0] == min(values)
+        assert [h.pop()[0] for _ in range(len(values))] == sorted(values)
+        assert len(h) == 0
+
+    h = DaryHeap(key=lambda task: task[1])
+    h["a"], h["b"] = (0, 14), (16, 12)
+    assert h.get_root() == ((16, 12), "b")
+    assert "a" in h and "c" not in h
+
+    try:
+        DaryHeap().pop()
+        assert False is True
+    except IndexError:
+        pass
+
+    h = DaryHeap(max_size=1)
+    h[0] = 0
+    try:
+        h[1] = 1
+        assert False is True
+    except Heap.FullHeapException:
+        pass
+
+    print("all tests successful")
@@ -0,0 +1,121 @@
+"""
+Dijkstra priority queue benchmark
+
+Runs dijkstra_distances.dijkstra with every priority queue backend
+on random and grid graphs with integer edge lengths,
+both as AdjEdge adjacency lists and as csr_graph.Graph,
+then dijkstra_distances.dial_dijkstra on the CSR graph.
+
+usage:
+    python3 dijkstra_benchmark.py [n]
+"""
+
+from random import randint, random, seed
+from sys import argv
+from time import perf_counter
+
+from csr_graph import Graph
+from dary_heap import DaryHeap
+from dijkstra_distances import AdjEdge, dial_dijkstra, dijkstra
+from heap import Heap
+from pairing_heap import PairingHeap
+from radix_heap import RadixHeap
+
+
+def random_length(integer=True, max_length=20):
+    """
+    returns:
+        random edge length, an int in [0, max_length] if integer,
+        a float in [0, max_length) otherwise
+    """
+    return randint(0, max_length) if integer else random() * max_length
+
+
+def random_edges(n, m, integer=True, max_length=20):
+    """
+    returns:
+        list of m random (u, v, length) edges among nodes 0, ..., n - 1,
+        self-loops and parallel edges included, lengths by random_length()
+    """
+    return [
+        (randint(0, n - 1), randint(0, n - 1), random_length(integer, max_length))
+        for _ in range(m)
+    ]
+
+
+def random_graph(n, m, max_length=100):
+    """
+    returns:
+        g: adjacency list with n nodes and m random edges,
+            plus a ring so that every node is reachable from 0
+    """
+    g = [None for _ in range(n)]
+    for u in range(n):
+        g[u] = AdjEdge((randint(1, max_length), (u + 1) % n), g[u])
+    for _ in range(m - n):
+        u = randint(0, n - 1)
+        g[u] = AdjEdge((randint(1, max_length), randint(0, n - 1)), g[u])
+    return g
+
+
+def grid_graph(side, max_length=100):
+    """
+    returns:
+        g: adjacency list of a side x side grid,
+            node r * side + c linked both ways to its 4 neighbours
+    """
+    g = [None for _ in range(side * side)]
+    for r in range(side):
+        for c in range(side):
+            u = r * side + c
+            for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+                if 0 <= r + dr < side and 0 <= c + dc < side:
+                    v = (r + dr) * side + (c + dc)
+                    g[u] = AdjEdge((randint(1, max_length), v), g[u])
+    return g
+
+
+QUEUES = [
+    ("Heap", Heap),
+    ("DaryHeap(d=4)", lambda: DaryHeap(d=4)),
+    ("DaryHeap(d=8)", lambda: DaryHeap(d=8)),
+    ("PairingHeap", PairingHeap),
+    ("RadixHeap", RadixHeap),
+]
+
+
+if __name__ == "__main__":
+    n = int(argv[1]) if len(argv) > 1 else 2_000
+
+    seed(0)
+    side = int(n ** 0.5)
+    graphs = [
+        (f"random n={n} m={4 * n}", random_graph(n, 4 * n)),
+        (f"grid {side}x{side}", grid_graph(side)),
+        (f"grid {side}x{side}, lengths 1..4", grid_graph(side, max_length=4)),
+    ]
+
+    for graph_name, g in graphs:
+        print(graph_name)
+        expected = None
+        for queue_name, queue in QUEUES:
+            start = perf_counter()
+            distances = dijkstra(g, 0, queue=queue)
+            elapsed = perf_counter() - start
+            expected = expected or distances
+            assert distances == expected
+            print(f"{queue_name:>20}: {elapsed:.4f}s")
+
+        csr = Graph.from_adj_edges(g)
+        for queue_name, queue in QUEUES:
+            start = perf_counter()
+            distances = dijkstra(csr, 0, queue=queue)
+            elapsed = perf_counter() - start
+            assert distances == expected
+            print(f"{queue_name + ' CSR':>20}: {elapsed:.4f}s")
+
+        start = perf_counter()
+        distances = dial_dijkstra(csr, 0)
+        elapsed = perf_counter() - start
+        assert distances == expected
+        print(f"{'Dial CSR':>20}: {elapsed:.4f}s")
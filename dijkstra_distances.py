@@ -4,7 +4,10 @@ https://www.wikiwand.com/en/Dijkstra%27s_algorithm
 """
 
 
+from bucket_queue import BucketQueue
+from csr_graph import Graph
 from heap import Heap
+import search_stats
 
 
 class AdjEdge:
@@ -13,48 +16,161 @@ class AdjEdge:
         self.nxt = nxt
 
 
-def dijkstra(g, s: int):
+def neighbours(g):
     """
     arguments:
-        g: weighted directed graph, adjacency list
+        g: weighted directed graph, adjacency list of AdjEdge chains
+            or csr_graph.Graph
+
+    returns:
+        function of a node u, iterable of the (length, v) pairs
+        of the edges u -> v, walked in place without copying g
+    """
+    if isinstance(g, Graph):
+        return g.neighbours
+    return lambda u: _chain(g[u])
+
+
+def _chain(edge):
+    while edge:
+        yield edge.edge
+        edge = edge.nxt
+
+
+def dijkstra(g, s: int, queue=Heap, stats=None):
+    """
+    arguments:
+        g: weighted directed graph, adjacency list of AdjEdge chains
+            or csr_graph.Graph
         s: key of starting node
+        queue: priority queue class (see heap.PriorityQueue),
+            e.g. dary_heap.DaryHeap, or radix_heap.RadixHeap
+            for non-negative integer lengths
+        stats: search_stats.SearchStats to count the search into,
+            None uses the one of search_stats.collecting(), if any
 
     returns:
         distances: list
             distances[z] will be the length of the shortest path from s to z
     """
-    n = len(g)  # number of nodes in the graph
+    stats, queue = search_stats.begin(stats, queue)
+    with search_stats.phase(stats, "search"):
+        distances, _ = _dijkstra(g, [s], queue, stats)
+    return distances
 
-    heap = Heap(max_size=n)
-    heap.insert(name=s, value=0)
 
-    distances = [None for _ in range(n)]
-    distances[s] = 0
+def _dijkstra(g, sources, queue, stats, labels=None):
+    """
+    the search loop of every function of this module
 
+    arguments:
+        g: see dijkstra()
+        sources: starting nodes, all at distance 0
+        queue: priority queue class
+        stats: SearchStats to add the nodes settled and the edges
+            relaxed towards nodes not yet settled to, or None
+        labels: list to fill with the source nearest to every node, or None
+
+    returns:
+        distances: see dijkstra()
+        labels
+    """
+    out = neighbours(g)
+
+    heap = queue()
+    distances = [None for _ in range(len(g))]
+    for s in sources:
+        if s not in heap:
+            heap.insert(name=s, value=0)
+            if labels is not None:
+                labels[s] = s
+
+    # two local counters are cheaper than a branch on stats per edge
+    settled = relaxed = 0
     while len(heap) > 0:
-        closest_new_node_value, closest_new_node_key = heap.pop()
-        distances[closest_new_node_key] = closest_new_node_value
-
-        u = g[closest_new_node_key]
-        while u:
-            edge_length, neighbour_key = u.edge
-
-            if distances[neighbour_key] is None:
-                # we haven't yet found a shortest path to u
-                dist = distances[closest_new_node_key] + edge_length
-                if neighbour_key not in heap:
-                    heap.insert(name=neighbour_key, value=dist)
-                    heap[neighbour_key] = dist
-                else:
-                    heap_neighbour_value = heap[neighbour_key]
-                    if heap_neighbour_value > dist:
-                        heap[neighbour_key] = dist
-
-            u = u.nxt
+        dist_u, u = heap.pop()
+        distances[u] = dist_u
+        settled += 1
+
+        for length, v in out(u):
+            if distances[v] is None:
+                relaxed += 1
+                dist = dist_u + length
+                if v not in heap or dist < heap[v]:
+                    heap[v] = dist
+                    if labels is not None:
+                        labels[v] = labels[u]
 
+    search_stats.count(stats, settled, relaxed)
+    return distances, labels
+
+
+def dial_dijkstra(g, s: int, stats=None):
+    """
+    Dial's algorithm: dijkstra with a bucket_queue.BucketQueue
+    when all edge lengths are small integers, with heap.Heap otherwise
+
+    arguments:
+        g: weighted directed graph, adjacency list of AdjEdge chains
+            or csr_graph.Graph, with non-negative edge lengths
+        s: key of starting node
+        stats: see dijkstra()
+
+    returns:
+        distances: see dijkstra()
+    """
+    stats = search_stats.resolve(stats)
+    with search_stats.phase(stats, "setup"):
+        if not isinstance(g, Graph):
+            g = Graph.from_adj_edges(g)
+        queue = _dial_queue(g)
+    stats, queue = search_stats.begin(stats, queue)
+    with search_stats.phase(stats, "search"):
+        distances, _ = _dijkstra(g, [s], queue, stats)
     return distances
 
 
+def _dial_queue(g):
+    """
+    returns:
+        a BucketQueue constructor if the edge lengths of the csr_graph.Graph g
+        are integers no longer than n + m, so that the buckets take no more
+        memory than the graph, heap.Heap otherwise
+    """
+    if g.weights_typecode() != "q":
+        return Heap
+
+    # every key in the queue is within the longest edge of the last popped one
+    longest = max(g.weights, default=0)
+    assert min(g.weights, default=0) >= 0, "negative edge length"
+    if longest > len(g) + g.edges_count():
+        return Heap
+    return lambda: BucketQueue(max_gap=longest)
+
+
+def multi_source_dijkstra(g, sources, queue=Heap, stats=None):
+    """
+    one dijkstra from all the sources at once, as if from a virtual
+    node linked to every source by a zero length edge
+
+    arguments:
+        g: weighted directed graph, adjacency list of AdjEdge chains
+            or csr_graph.Graph
+        sources: iterable of starting nodes
+        queue: priority queue class (see heap.PriorityQueue)
+        stats: see dijkstra()
+
+    returns:
+        distances: list
+            distances[z] will be the distance from the nearest source to z
+        labels: list
+            labels[z] will be the source nearest to z, None if unreachable
+    """
+    stats, queue = search_stats.begin(stats, queue)
+    with search_stats.phase(stats, "search"):
+        return _dijkstra(g, sources, queue, stats, labels=[None for _ in range(len(g))])
+
+
 if __name__ == "__main__":
     from enum import Enum
 
@@ -215,4 +331,48 @@ if __name__ == "__main__":
     ##################################################
     print()
 
+    from dary_heap import DaryHeap
+    from pairing_heap import PairingHeap
+    from radix_heap import RadixHeap
+
+    for queue in [DaryHeap, PairingHeap, RadixHeap]:
+        assert dijkstra(graph, start, queue=queue) == distances
+        assert dijkstra(Graph.from_adj_edges(graph), start, queue=queue) == distances
+
+    from random import randint
+
+    from dijkstra_benchmark import random_edges
+
+    for _ in range(50):
+        n = randint(1, 50)
+        edges = random_edges(n, randint(0, 200))
+        adj = [None for _ in range(n)]
+        for u, v, w in edges:
+            adj[u] = AdjEdge((w, v), adj[u])
+        csr = Graph.from_edges(edges, n=n)
+        assert dijkstra(csr, 0) == dijkstra(adj, 0)
+        assert dial_dijkstra(adj, 0) == dial_dijkstra(csr, 0) == dijkstra(csr, 0)
+        fractional = Graph.from_edges([(u, v, w / 4) for u, v, w in edges], n=n, typecode="d")
+        assert dial_dijkstra(fractional, 0) == dijkstra(fractional, 0)
+        assert _dial_queue(fractional) is Heap
+
+        sources = [randint(0, n - 1) for _ in range(randint(1, 5))]
+        tables = {s: dijkstra(csr, s) for s in sources}
+        nearest, labels = multi_source_dijkstra(adj, sources)
+        for z in range(n):
+            reachable = [tables[s][z] for s in sources if tables[s][z] is not None]
+            assert nearest[z] == min(reachable, default=None)
+            if nearest[z] is None:
+                assert labels[z] is None
+            else:
+                assert tables[labels[z]][z] == nearest[z]
+
+    # a few very long edges fall back to a heap instead of 10 ** 7 buckets
+    long_edges = Graph.from_edges([(0, 1, 10 ** 7), (1, 2, 1)])
+    assert _dial_queue(long_edges) is Heap
+    assert dial_dijkstra(long_edges, 0) == dijkstra(long_edges, 0) == [0, 10 ** 7, 10 ** 7 + 1]
+    assert _dial_queue(Graph.from_edges([(0, 1, 3), (1, 2, 1)])) is not Heap
+
+    assert multi_source_dijkstra(graph, []) == ([None] * len(graph), [None] * len(graph))
+
     print("all tests successful")
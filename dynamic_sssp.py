@@ -0,0 +1,250 @@
+"""
+Dynamic single-source shortest paths
+(Ramalingam and Reps, An incremental algorithm for a generalization
+of the shortest-path problem)
+
+Keeps the distances from s and a shortest path tree under edge changes,
+touching only the nodes whose distance may change:
+    - a shorter edge u -> v can only improve v and the nodes after it:
+      a Dijkstra seeded with v alone, that stops at nodes it doesn't improve
+    - a longer (or removed) edge u -> v only matters if it is a tree edge,
+      then only the subtree below v can get farther: its nodes are
+      seeded with their best edge from outside the subtree, and a
+      Dijkstra restricted to the subtree settles them again
+Both repairs use the decrease-key of heap.Heap.
+"""
+
+from csr_graph import Graph
+from heap import Heap
+
+
+INF = float("+inf")
+
+
+class DynamicSSSP:
+    """
+    distances from s and shortest path tree of a directed graph with
+    non-negative edge lengths, nodes are 0, ..., n - 1 and there is at
+    most one edge u -> v (the shortest one is kept)
+    """
+
+    def __init__(self, g, s, queue=Heap):
+        """
+        arguments:
+            g: csr_graph.Graph, or adjacency list of dijkstra_distances.AdjEdge chains
+            s: starting node
+            queue: priority queue class (see heap.PriorityQueue)
+        """
+        if not isinstance(g, Graph):
+            g = Graph.from_adj_edges(g)
+        n = len(g)
+        self.s = s
+        self.queue = queue
+
+        # out_edges[u][v] == in_edges[v][u] == length of u -> v
+        self.out_edges = [{} for _ in range(n)]
+        self.in_edges = [{} for _ in range(n)]
+        for u, v, w in g.edges():
+            if v not in self.out_edges[u] or w < self.out_edges[u][v]:
+                self.out_edges[u][v] = self.in_edges[v][u] = w
+
+        self.dist = [INF for _ in range(n)]
+        self.parent = [None for _ in range(n)]
+        self.children = [set() for _ in range(n)]
+        self.__improve({s: (0, None)})
+
+    def __len__(self):
+        return len(self.dist)
+
+    def distances(self):
+        """
+        returns:
+            distances: list, as returned by dijkstra_distances.dijkstra
+        """
+        return [None if d == INF else d for d in self.dist]
+
+    def path(self, t):
+        """
+        returns:
+            list of nodes of the tree path from s to t, None if unreachable
+        """
+        if self.dist[t] == INF:
+            return None
+        path = []
+        while t is not None:
+            path.append(t)
+            t = self.parent[t]
+        return path[::-1]
+
+    def add_edge(self, u, v, w):
+        assert v not in self.out_edges[u]
+        return self.__set_length(u, v, w)
+
+    def remove_edge(self, u, v):
+        return self.__set_length(u, v, INF)
+
+    def decrease_weight(self, u, v, w):
+        assert w <= self.out_edges[u][v]
+        return self.__set_length(u, v, w)
+
+    def increase_weight(self, u, v, w):
+        assert w >= self.out_edges[u][v]
+        return self.__set_length(u, v, w)
+
+    def __set_length(self, u, v, w):
+        """
+        returns:
+            number of nodes whose distance changed
+        """
+        old = self.out_edges[u].get(v, INF)
+        if w == INF:
+            del self.out_edges[u][v]
+            del self.in_edges[v][u]
+        else:
+            self.out_edges[u][v] = self.in_edges[v][u] = w
+
+        if w < old:
+            if self.dist[u] + w < self.dist[v]:
+                return self.__improve({v: (self.dist[u] + w, u)})
+            return 0
+        if w > old and self.parent[v] == u:
+            return self.__repair_subtree(v)
+        return 0
+
+    def __improve(self, seeds):
+        """
+        Dijkstra from seeds, a dict node -> (candidate distance, parent),
+        through the nodes whose distance it improves
+
+        returns:
+            number of nodes improved
+        """
+        dist, out_edges = self.dist, self.out_edges
+        heap = self.queue()
+        candidate_parent = {}
+        for v, (d, u) in seeds.items():
+            heap.insert(name=v, value=d)
+            candidate_parent[v] = u
+
+        improved = 0
+        while len(heap) > 0:
+            dist_u, u = heap.pop()
+            if dist_u >= dist[u]:
+                continue
+            dist[u] = dist_u
+            self.__set_parent(u, candidate_parent[u])
+            improved += 1
+
+            for v, w in out_edges[u].items():
+                candidate = dist_u + w
+                if candidate < dist[v] and (v not in heap or candidate < heap[v]):
+                    heap[v] = candidate
+                    candidate_parent[v] = u
+        return improved
+
+    def __repair_subtree(self, v):
+        """
+        the tree edge into v got longer or disappeared:
+        recomputes the distances of the subtree of v
+
+        returns:
+            number of nodes whose distance changed
+        """
+        dist, in_edges = self.dist, self.in_edges
+
+        subtree = [v]
+        for x in subtree:
+            subtree.extend(self.children[x])
+        old = {x: dist[x] for x in subtree}
+        for x in subtree:
+            dist[x] = INF
+            self.__set_parent(x, None)
+
+        # best way into every subtree node from the rest of the tree,
+        # whose distances can't change
+        seeds = {}
+        for x in subtree:
+            best = (INF, None)
+            for y, w in in_edges[x].items():
+                if dist[y] + w < best[0]:
+                    best = (dist[y] + w, y)
+            if best[1] is not None:
+                seeds[x] = best
+        self.__improve(seeds)
+
+        return sum(1 for x in subtree if dist[x] != old[x])
+
+    def __set_parent(self, v, u):
+        if self.parent[v] is not None:
+            self.children[self.parent[v]].discard(v)
+        self.parent[v] = u
+        if u is not None:
+            self.children[u].add(v)
+
+
+if __name__ == "__main__":
+    from random import choice, randint, random
+
+    from dijkstra_benchmark import random_edges, random_length
+    from dijkstra_distances import AdjEdge, dijkstra
+
+    def current_graph(sssp):
+        return Graph.from_edges(
+            ((u, v, w) for u in range(len(sssp)) for v, w in sssp.out_edges[u].items()),
+            n=len(sssp),
+        )
+
+    def check(sssp):
+        distances = dijkstra(current_graph(sssp), sssp.s)
+        if any(type(d) is float for d in distances):
+            assert all(
+                (d is None and e is None) or abs(d - e) < 1e-9
+                for d, e in zip(sssp.distances(), distances)
+            )
+        else:
+            assert sssp.distances() == distances
+        for v in range(len(sssp)):
+            if distances[v] is not None and v != sssp.s:
+                u = sssp.parent[v]
+                assert abs(sssp.dist[u] + sssp.out_edges[u][v] - sssp.dist[v]) < 1e-9
+                assert v in sssp.children[u]
+                assert sssp.path(v)[0] == sssp.s
+
+    for _ in range(200):
+        n = randint(1, 30)
+        integer = randint(0, 3) > 0
+        edges = random_edges(n, randint(0, 3 * n), integer=integer)
+        sssp = DynamicSSSP(Graph.from_edges(edges, n=n), randint(0, n - 1))
+        check(sssp)
+
+        for _ in range(30):
+            present = [(u, v) for u in range(n) for v in sssp.out_edges[u]]
+            operation = randint(0, 3)
+            if operation == 0 or not present:
+                u, v = randint(0, n - 1), randint(0, n - 1)
+                if v not in sssp.out_edges[u]:
+                    sssp.add_edge(u, v, random_length(integer))
+            else:
+                u, v = choice(present)
+                w = sssp.out_edges[u][v]
+                if operation == 1:
+                    sssp.remove_edge(u, v)
+                elif operation == 2:
+                    sssp.decrease_weight(u, v, w * random())
+                else:
+                    sssp.increase_weight(u, v, w + random_length(integer))
+            check(sssp)
+
+    adj = [AdjEdge((1, 1), AdjEdge((5, 2), None)), AdjEdge((1, 2), None), None]
+    sssp = DynamicSSSP(adj, 0)
+    assert sssp.distances() == [0, 1, 2] and sssp.path(2) == [0, 1, 2]
+    assert sssp.increase_weight(1, 2, 10) == 1
+    assert sssp.distances() == [0, 1, 5] and sssp.path(2) == [0, 2]
+    assert sssp.remove_edge(0, 2) == 1
+    assert sssp.distances() == [0, 1, 11]
+    assert sssp.remove_edge(0, 1) == 2
+    assert sssp.distances() == [0, None, None] and sssp.path(2) is None
+    assert sssp.add_edge(0, 2, 3) == 1
+    assert sssp.distances() == [0, None, 3]
+
+    print("all tests successful")
@@ -0,0 +1,60 @@
+"""
+Dynamic SSSP update benchmark
+
+Applies random edge length changes to a grid graph and times the
+repair of dynamic_sssp.DynamicSSSP against a full dijkstra recompute.
+
+usage:
+    python3 dynamic_sssp_benchmark.py [n] [updates]
+"""
+
+from random import choice, seed
+from sys import argv
+from time import perf_counter
+
+from csr_graph import Graph
+from dijkstra_benchmark import grid_graph
+from dijkstra_distances import dijkstra
+from dynamic_sssp import DynamicSSSP
+
+
+if __name__ == "__main__":
+    n = int(argv[1]) if len(argv) > 1 else 10_000
+    updates = int(argv[2]) if len(argv) > 2 else 200
+
+    seed(0)
+    side = int(n ** 0.5)
+    g = Graph.from_adj_edges(grid_graph(side))
+    sssp = DynamicSSSP(g, 0)
+    edges = [(u, v) for u in range(len(g)) for v in sssp.out_edges[u]]
+    print(f"grid {side}x{side}, {updates} updates")
+
+    for name, change in [
+        ("decrease", lambda w: max(1, w // 2)),
+        ("increase", lambda w: w * 2),
+    ]:
+        repair, touched = 0, 0
+        for _ in range(updates):
+            u, v = choice(edges)
+            w = sssp.out_edges[u][v]
+            start = perf_counter()
+            if name == "decrease":
+                touched += sssp.decrease_weight(u, v, change(w))
+            else:
+                touched += sssp.increase_weight(u, v, change(w))
+            repair += perf_counter() - start
+
+        current = Graph.from_edges(
+            ((u, v, w) for u in range(len(g)) for v, w in sssp.out_edges[u].items()),
+            n=len(g),
+        )
+        start = perf_counter()
+        distances = dijkstra(current, 0)
+        recompute = perf_counter() - start
+        assert distances == sssp.distances()
+
+        print(
+            f"{name:>9}: {repair / updates * 1e3:.3f}ms per update "
+            f"({touched / updates:.1f} nodes changed), "
+            f"full dijkstra {recompute * 1e3:.3f}ms ({recompute * updates / repair:.0f}x)"
+        )
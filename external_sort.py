@@ -0,0 +1,206 @@
+"""
+External sorting
+https://www.wikiwand.com/en/External_sorting
+
+Sorts streams bigger than memory: records are read in chunks that fit
+the memory budget, each chunk is heapsorted in place and spilled to a
+temporary file as a sorted run, then the runs are k-way merged through
+a heap.Heap holding the head of every run.
+"""
+
+import pickle
+from sys import getsizeof
+from tempfile import TemporaryDirectory
+from os import path as os_path
+
+from heap import Heap
+from heapsort import heapsort
+from top_k import Descending
+
+
+KEY, RUN, RECORD = 0, 1, 2
+
+# records pickled together in a single write/read
+BATCH_SIZE = 1024
+
+
+def external_sorted(
+    records,
+    key=None,
+    reverse=False,
+    memory_budget=64 * 2 ** 20,
+    buffer_size=2 ** 20,
+    fan_in=64,
+):
+    """
+    arguments:
+        records: iterable of picklable records, consumed lazily
+            (e.g. an open file, which yields its lines)
+        key: function applied to records to compare them
+        reverse: sort in descending order
+        memory_budget: approximate bytes of records held in memory
+            at once, measured with sys.getsizeof
+        buffer_size: bytes of I/O buffering for every run file
+        fan_in: maximum number of runs merged at once,
+            more runs are merged in several passes
+
+    returns:
+        lazy iterator over the sorted records,
+        temporary files are removed once it is exhausted or closed
+    """
+    assert fan_in >= 2
+    records = iter(records)
+
+    with TemporaryDirectory() as directory:
+        runs = []
+        chunk, chunk_bytes = [], 0
+        for record in records:
+            chunk.append(record)
+            chunk_bytes += getsizeof(record)
+            if chunk_bytes >= memory_budget:
+                runs.append(_spill(chunk, key, reverse, directory, len(runs), buffer_size))
+                chunk, chunk_bytes = [], 0
+
+        if not runs:
+            # everything fits in memory
+            heapsort(chunk, key=key, reverse=reverse)
+            yield from chunk
+            return
+
+        if chunk:
+            runs.append(_spill(chunk, key, reverse, directory, len(runs), buffer_size))
+        del chunk
+
+        # merge passes until a single pass can merge all runs
+        next_run = len(runs)
+        while len(runs) > fan_in:
+            merged = []
+            for i in range(0, len(runs), fan_in):
+                run_path = os_path.join(directory, f"run{next_run}")
+                next_run += 1
+                _write_run(
+                    run_path,
+                    _merge(runs[i:i + fan_in], key, reverse, buffer_size),
+                    buffer_size,
+                )
+                merged.append(run_path)
+            runs = merged
+
+        yield from _merge(runs, key, reverse, buffer_size)
+
+
+def _spill(chunk, key, reverse, directory, i, buffer_size):
+    """
+    sorts chunk in place and writes it as a run file
+
+    returns:
+        path of the run file
+    """
+    heapsort(chunk, key=key, reverse=reverse)
+    run_path = os_path.join(directory, f"run{i}")
+    _write_run(run_path, chunk, buffer_size)
+    chunk.clear()
+    return run_path
+
+
+def _write_run(run_path, records, buffer_size):
+    with open(run_path, "wb", buffering=buffer_size) as f:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) == BATCH_SIZE:
+                pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+                batch = []
+        if batch:
+            pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _read_run(run_path, buffer_size):
+    """
+    returns:
+        lazy iterator over the records of a run file
+    """
+    with open(run_path, "rb", buffering=buffer_size) as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+
+def _merge(runs, key, reverse, buffer_size):
+    readers = [_read_run(run_path, buffer_size) for run_path in runs]
+    return kway_merge(readers, key=key, reverse=reverse)
+
+
+def kway_merge(iterables, key=None, reverse=False):
+    """
+    arguments:
+        iterables: iterables each sorted by key (descending if reverse)
+        key: function applied to records to compare them
+        reverse: the iterables are sorted in descending order
+
+    returns:
+        lazy iterator over all records in sorted order
+
+    the heap holds one (key, run, record) entry per iterable, named after
+    its index; indexes are distinct, so records themselves are never compared
+    """
+    iterators = [iter(iterable) for iterable in iterables]
+    h = Heap(key=Descending) if reverse else Heap()
+
+    def entry(run, record):
+        return (record if key is None else key(record), run, record)
+
+    for run, iterator in enumerate(iterators):
+        for record in iterator:
+            h.insert(name=run, value=entry(run, record))
+            break
+
+    while len(h) > 0:
+        value, run = h.get_root()
+        yield value[RECORD]
+        for record in iterators[run]:
+            h.replace_root(name=run, value=entry(run, record))
+            break
+        else:
+            h.pop()
+
+
+if __name__ == "__main__":
+    from random import randint
+    from tempfile import TemporaryFile
+
+    for _ in range(20):
+        arr = [randint(-1000, 1000) for _ in range(randint(0, 3000))]
+        budget = randint(1, 20) * 1000
+        assert list(external_sorted(arr, memory_budget=budget)) == sorted(arr)
+        assert (
+            list(external_sorted(iter(arr), reverse=True, memory_budget=budget, fan_in=2))
+            == sorted(arr, reverse=True)
+        )
+
+    # intervals streamed from a file, sorted by finishing time
+    START, END = 0, 1
+    tasks = [(randint(0, 100), randint(100, 200)) for _ in range(5000)]
+    with TemporaryFile("w+") as f:
+        for start, end in tasks:
+            f.write(f"{start} {end}\n")
+        f.seek(0)
+
+        stream = (tuple(map(int, line.split())) for line in f)
+        result = external_sorted(stream, key=lambda task: task[END], memory_budget=4096)
+        ends = [task[END] for task in result]
+        assert ends == sorted(task[END] for task in tasks)
+
+    runs = [[1, 4, 7], [], [2, 5, 8], [0, 3, 6, 9]]
+    assert list(kway_merge(runs)) == list(range(10))
+    assert list(kway_merge(map(reversed, runs), reverse=True)) == list(range(9, -1, -1))
+
+    # closing the iterator early cleans up its temporary files
+    result = external_sorted(range(10 ** 4, 0, -1), memory_budget=1000)
+    assert next(result) == 1 and next(result) == 2
+    result.close()
+
+    print("all tests successful")
@@ -0,0 +1,175 @@
+"""
+Fenwick tree (binary indexed tree)
+https://www.wikiwand.com/en/Fenwick_tree
+
+Inversion (discrete mathematics)
+https://www.wikiwand.com/en/Inversion_(discrete_mathematics)
+
+Counting, for every new item of a stream, how many earlier items are
+bigger gives the number of inversions one item at a time, in O(log domain)
+per item, without ever sorting or storing the stream.
+"""
+
+from heapsort import heapsorted as sorted
+from binary_search import bisect_right
+
+
+class FenwickTree:
+    """
+    prefix sums over counts[0], ..., counts[n - 1]
+    with O(log n) point updates and queries
+    """
+
+    def __init__(self, n):
+        # self.__tree[i] will be the sum of counts[i - lowbit(i), i),
+        # 1-indexed, lowbit(i) being the lowest set bit of i
+        self.__tree = [0 for _ in range(n + 1)]
+
+    def __len__(self):
+        return len(self.__tree) - 1
+
+    def add(self, i, delta=1):
+        """
+        counts[i] += delta
+        """
+        # a negative i would never leave the loop below
+        assert 0 <= i < len(self)
+        tree = self.__tree
+        i += 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, i):
+        """
+        returns:
+            counts[0] + ... + counts[i - 1]
+        """
+        tree = self.__tree
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, lo, hi):
+        """
+        returns:
+            counts[lo] + ... + counts[hi - 1]
+        """
+        return self.prefix_sum(hi) - self.prefix_sum(lo)
+
+
+class InversionCounter:
+    """
+    number of inversions of a stream of integers in range(domain),
+    over the whole stream or over a sliding window of the latest items
+    """
+
+    def __init__(self, domain, window=None):
+        """
+        arguments:
+            domain: items are integers in range(domain)
+            window: only count inversions among the latest window items,
+                None (default) counts over the whole stream
+        """
+        self.__tree = FenwickTree(domain)
+        self.__window = window
+        self.__items = [] if window is not None else None
+        self.__oldest = 0  # index in self.__items of the oldest windowed item
+        self.__count = 0
+        self.inversions = 0
+
+    def __len__(self):
+        return self.__count
+
+    def push(self, item):
+        """
+        appends item to the stream
+
+        returns:
+            inversions: number of inversions of the stream (or window)
+        """
+        assert 0 <= item < len(self.__tree), "item out of range(domain)"
+        if self.__window is not None and self.__count == self.__window:
+            self.__evict()
+
+        # earlier items bigger than item
+        self.inversions += self.__count - self.__tree.prefix_sum(item + 1)
+        self.__tree.add(item)
+        self.__count += 1
+
+        if self.__window is not None:
+            self.__items.append(item)
+
+        return self.inversions
+
+    def __evict(self):
+        oldest = self.__items[self.__oldest]
+        self.__oldest += 1
+        if self.__oldest * 2 > len(self.__items):
+            # drop the evicted prefix, amortized O(1)
+            del self.__items[:self.__oldest]
+            self.__oldest = 0
+
+        # the oldest item formed an inversion with every smaller later one
+        self.__tree.add(oldest, -1)
+        self.__count -= 1
+        self.inversions -= self.__tree.prefix_sum(oldest)
+
+
+def inversions(arr):
+    """
+    returns:
+        number of inversions of arr, O(n log n)
+    """
+    # rank items so that any comparable values can be counted
+    ranks = sorted(set(arr))
+    counter = InversionCounter(len(ranks))
+    for item in arr:
+        counter.push(bisect_right(ranks, item) - 1)
+    return counter.inversions
+
+
+if __name__ == "__main__":
+    from random import randint
+
+    def brute_force(v):
+        return sum(
+            1 for i in range(len(v)) for j in range(i + 1, len(v)) if v[j] < v[i]
+        )
+
+    t = FenwickTree(10)
+    for i in range(10):
+        t.add(i, i)
+    assert len(t) == 10
+    assert t.prefix_sum(0) == 0
+    assert t.prefix_sum(10) == sum(range(10))
+    assert t.range_sum(3, 7) == 3 + 4 + 5 + 6
+
+    for item in [-1, 5]:
+        counter = InversionCounter(5)
+        try:
+            counter.push(item)
+            in_domain = True
+        except AssertionError:
+            in_domain = False
+        assert not in_domain and len(counter) == 0 and counter.inversions == 0
+
+    assert inversions([5, 7, 6]) == 1
+    assert inversions([7, 6, 3]) == 3
+    assert inversions(["c", "a", "b"]) == 2
+    assert inversions([]) == 0
+
+    for _ in range(100):
+        domain = randint(1, 20)
+        v = [randint(0, domain - 1) for _ in range(randint(0, 100))]
+        assert inversions(v) == brute_force(v)
+
+        window = randint(1, 10)
+        counter = InversionCounter(domain, window=window)
+        for i, item in enumerate(v):
+            assert counter.push(item) == brute_force(v[max(0, i + 1 - window):i + 1])
+            assert len(counter) == min(i + 1, window)
+
+    print("all tests successful")
@@ -0,0 +1,161 @@
+"""
+Binary CSR graph file format
+
+    header   40 bytes, little-endian:
+             magic b"CSRG", version u32, n u64, m u64,
+             names length u64, lengths typecode (b"q" or b"d"), 7 padding bytes
+    offsets  (n + 1) int64
+    targets  m int64
+    weights  m int64 or float64
+    names    optional JSON list of node labels, UTF-8
+
+All sections are 8-byte aligned, so a loader can memory-map the file
+and view the sections as typed arrays without copying or parsing them:
+startup is O(1) in the size of the graph, pages are read on demand,
+and processes mapping the same file share one copy in the page cache.
+"""
+
+import json
+import mmap
+import struct
+from array import array
+from os import fstat
+from sys import byteorder
+
+from csr_graph import Graph
+
+
+MAGIC = b"CSRG"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQQc7x")
+
+
+class GraphFileException(Exception):
+    def __init__(self, path, reason):
+        super().__init__(f"{path}: {reason}")
+
+
+def write_graph(g, path):
+    """
+    arguments:
+        g: csr_graph.Graph with integer nodes
+        path: file to write
+    """
+    typecode = g.weights_typecode()
+    assert typecode in ("q", "d")
+    # sections are written in native order, only little-endian is supported
+    assert byteorder == "little"
+
+    names = b"" if g.names is None else json.dumps(g.names).encode()
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(
+            MAGIC, VERSION, len(g), g.edges_count(), len(names), typecode.encode()
+        ))
+        for column in (g.offsets, g.targets):
+            # load_graph reads offsets and targets as int64
+            if memoryview(column).format != "q":
+                column = array("q", column)
+            f.write(memoryview(column).cast("B"))
+        f.write(memoryview(g.weights).cast("B"))
+        f.write(names)
+
+
+def load_graph(path):
+    """
+    arguments:
+        path: file written by write_graph
+
+    returns:
+        csr_graph.Graph whose arrays are read-only memoryviews
+        over a shared memory map of the file
+    """
+    with open(path, "rb") as f:
+        # mmap can't map an empty file
+        if fstat(f.fileno()).st_size < HEADER.size:
+            raise GraphFileException(path, "truncated header")
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, n, edges, names_length, typecode = HEADER.unpack_from(m)
+    typecode = typecode.decode()
+    if magic != MAGIC or version != VERSION or typecode not in ("q", "d"):
+        m.close()
+        raise GraphFileException(path, "not a graph file of a supported version")
+
+    start = HEADER.size
+    sections = []
+    for length in (n + 1, edges, edges):
+        sections.append((start, start + 8 * length))
+        start += 8 * length
+    if len(m) != start + names_length:
+        m.close()
+        raise GraphFileException(path, "size does not match the header")
+
+    view = memoryview(m)
+    (o_lo, o_hi), (t_lo, t_hi), (w_lo, w_hi) = sections
+    offsets = view[o_lo:o_hi].cast("q")
+    targets = view[t_lo:t_hi].cast("q")
+    weights = view[w_lo:w_hi].cast(typecode)
+
+    names = None
+    if names_length > 0:
+        names = json.loads(bytes(view[start:start + names_length]).decode())
+
+    return Graph(offsets, targets, weights, names=names, buffer=m)
+
+
+if __name__ == "__main__":
+    from importlib import import_module
+    from os import path
+    from random import randint
+    from tempfile import TemporaryDirectory
+
+    from dijkstra_benchmark import random_edges
+    from dijkstra_distances import dijkstra
+
+    bellman_ford = import_module("bellman-ford_distance").bellman_ford
+
+    with TemporaryDirectory() as directory:
+        graph_path = path.join(directory, "graph.csrg")
+
+        for _ in range(20):
+            n = randint(1, 40)
+            edges = random_edges(n, randint(0, 150), integer=n % 2 == 1)
+            g = Graph.from_edges(edges, n=n)
+            write_graph(g, graph_path)
+
+            loaded = load_graph(graph_path)
+            assert len(loaded) == n and loaded.edges_count() == len(edges)
+            assert loaded.weights_typecode() == g.weights_typecode()
+            assert list(loaded.edges()) == list(g.edges())
+            assert dijkstra(loaded, 0) == dijkstra(g, 0)
+            t = randint(0, n - 1)
+            assert bellman_ford(loaded, 0, t) == bellman_ford(g, 0, t)
+
+        g = Graph.from_dict({"a": {"u": 2, "b": 1}, "b": {}, "u": {"v": 3}, "v": {"b": -6}})
+        write_graph(g, graph_path)
+        loaded = load_graph(graph_path)
+        assert loaded.names == ["a", "b", "u", "v"]
+        assert bellman_ford(loaded, "a", "b") == -1
+
+        # narrower offsets and targets are widened to int64
+        g = Graph(array("i", [0, 2, 3, 3]), array("i", [1, 2, 0]), array("q", [4, 5, 6]))
+        write_graph(g, graph_path)
+        loaded = load_graph(graph_path)
+        assert list(loaded.edges()) == list(g.edges())
+
+        open(graph_path, "wb").close()
+        try:
+            load_graph(graph_path)
+            assert False is True
+        except GraphFileException:
+            pass
+
+        with open(graph_path, "wb") as f:
+            f.write(b"not a graph" * 10)
+        try:
+            load_graph(graph_path)
+            assert False is True
+        except GraphFileException:
+            pass
+
+    print("all tests successful")
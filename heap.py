@@ -3,13 +3,39 @@ Heap (data structure)
 https://www.wikiwand.com/en/Heap_(data_structure)
 """
 
+from typing import Protocol
+
 VALUE, NAME = 0, 1
 
 
+class PriorityQueue(Protocol):
+    """
+    name-value min-priority queue, the interface shared by
+    Heap, dary_heap.DaryHeap, pairing_heap.PairingHeap, radix_heap.RadixHeap
+    and bucket_queue.BucketQueue
+
+    constructors take (max_size=None, key=lambda item: item),
+    queue[name] = value inserts name or updates its value,
+    pop() and get_root() return (value, name) pairs
+    """
+
+    def __contains__(self, name): ...
+    def __getitem__(self, name): ...
+    def __setitem__(self, name, value): ...
+    def __len__(self): ...
+    def insert(self, name, value): ...
+    def update(self, name, value): ...
+    def get_root(self): ...
+    def pop(self): ...
+
+
 class Heap:
     """
     name-value min-heap:
     key(parent.value) <= key(child.value)
+
+    names can be any hashable and need not be dense,
+    memory scales with the number of live items
     """
 
     def parent_idx(child_idx): return (child_idx - 1) // 2
@@ -20,67 +46,85 @@ class Heap:
         def __init__(self):
             super().__init__("heap is already full")
 
-    def __init__(self, max_size, key=lambda item: item):
-        self.__nodes_count = 0
-        self.__allocated_size = max_size
-
-        # self.__arr[i] will be the (value, name) tuple of the ith element of the heap
-        self.__arr = [None for _ in range(max_size)]
-
-        # self.__position[i] will be the index of the item with name i in self.__arr
-        self.__position = [None for _ in range(max_size)]
-
-        # key is only applied to value, not whole (value, name) pair
-        self.__key = lambda item: key(item[VALUE])
+    def __init__(self, max_size=None, key=lambda item: item):
+        """
+        arguments:
+            max_size: maximum number of items the heap can hold,
+                None (default) lets the heap grow as needed
+            key: function applied to values to compare them
+        """
+        self.__max_size = max_size
+
+        # parallel columns: self.__keys[i], self.__values[i] and self.__names[i]
+        # are the cached key, the value and the name of the ith element
+        self.__keys = []
+        self.__values = []
+        self.__names = []
+
+        # self.__position[name] will be the index of the item with that name,
+        # only live names are stored, so any hashable can be a name
+        self.__position = {}
+
+        self.__key = key
+
+    @classmethod
+    def from_items(cls, items, max_size=None, key=lambda item: item):
+        """
+        arguments:
+            items: iterable of (name, value) pairs,
+                a later pair overrides an earlier one with the same name
+            max_size, key: see Heap()
+
+        returns:
+            h: heap holding all items, built bottom-up in O(n)
+        """
+        h = cls(max_size=max_size, key=key)
+        h.update_many(items)
+        return h
 
     def __contains__(self, name):
-        return self.__position[name] is not None
+        return name in self.__position
 
-    def __getitem__(self, name: int):
-        if self.__nodes_count == 0:
+    def __getitem__(self, name):
+        if len(self.__names) == 0:
             raise IndexError("empty heap")
         elif name not in self:
             raise KeyError(name)
         else:
             i = self.__position[name]
-            assert 0 <= i < self.__nodes_count
-            value, _ = self.__arr[i]
-            return value
+            assert 0 <= i < len(self.__names)
+            return self.__values[i]
 
     def get_root(self):
-        if self.__nodes_count == 0:
+        if len(self.__names) == 0:
             raise IndexError("pop from empty heap")
         else:
-            return self.__arr[0]
+            return (self.__values[0], self.__names[0])
 
     def __len__(self):
-        return self.__nodes_count
+        return len(self.__names)
 
     def __str__(self):
-        return f"{self.__arr[:self.__nodes_count]}"
-
-    def __swap(self, i, j):
-        _, ith_node_name = self.__arr[i]
-        _, jth_node_name = self.__arr[j]
-        self.__arr[i], self.__arr[j] = self.__arr[j], self.__arr[i]
-        self.__position[ith_node_name], self.__position[jth_node_name] = j, i
+        return f"{list(zip(self.__values, self.__names))}"
 
     def __setitem__(self, name, value):
-        if self.__nodes_count == self.__allocated_size:
-            raise Heap.FullHeapException
+        position = self.__position
+        if name not in position:
+            # insert: open a hole at the end and move it up
+            if len(self.__names) == self.__max_size:
+                raise Heap.FullHeapException
+            self.__keys.append(None)
+            self.__values.append(None)
+            self.__names.append(None)
+            self.__heapify_up(len(self.__names) - 1, self.__key(value), value, name)
         else:
-            self.__arr[self.__nodes_count] = (value, name)
-            if name not in self:
-                # insert
-                self.__position[name] = self.__nodes_count
-                self.__heapify_up(self.__nodes_count)
-                self.__nodes_count += 1
+            # update: the hole is the item's own slot, it moves either way
+            i = position[name]
+            k = self.__key(value)
+            if i > 0 and k < self.__keys[Heap.parent_idx(i)]:
+                self.__heapify_up(i, k, value, name)
             else:
-                # update and heapify
-                i = self.__position[name]
-                self.__arr[i] = (value, name)
-                self.__heapify_up(i)
-                self.__heapify_down(i)
+                self.__heapify_down(i, k, value, name)
 
     def insert(self, name, value):
         assert name not in self
@@ -90,54 +134,174 @@ class Heap:
         assert name in self
         self[name] = value
 
-    def __heapify_up(self, index):
-        child_idx, parent_idx = index, Heap.parent_idx(index)
-        child, parent = self.__arr[child_idx], self.__arr[parent_idx]
+    def update_many(self, items):
+        """
+        arguments:
+            items: iterable of (name, value) pairs to insert or update
+
+        small batches are sifted one by one in O(b log n),
+        big ones are written in place and the heap is rebuilt in O(n)
+        """
+        items = list(items)
+        n = len(self.__names)
+        if len(items) * n.bit_length() < n:
+            for name, value in items:
+                self[name] = value
+            return
+
+        keys, values, names, position = (
+            self.__keys, self.__values, self.__names, self.__position
+        )
+        for name, value in items:
+            if name in position:
+                i = position[name]
+                keys[i], values[i] = self.__key(value), value
+            else:
+                if len(names) == self.__max_size:
+                    self.__heapify()
+                    raise Heap.FullHeapException
+                position[name] = len(names)
+                keys.append(self.__key(value))
+                values.append(value)
+                names.append(name)
+        self.__heapify()
+
+    def meld(self, other):
+        """
+        arguments:
+            other: heap whose items are added to this one,
+                its values override ours on names present in both
+
+        other is left untouched, its cached keys are reused
+        when both heaps share the same key function
+        """
+        if other.__key is not self.__key:
+            self.update_many(other.items())
+            return
 
-        if child_idx > 0 and self.__key(child) < self.__key(parent):
-            self.__swap(child_idx, parent_idx)
-            self.__heapify_up(parent_idx)
+        keys, values, names, position = (
+            self.__keys, self.__values, self.__names, self.__position
+        )
+        for k, value, name in zip(other.__keys, other.__values, other.__names):
+            if name in position:
+                i = position[name]
+                keys[i], values[i] = k, value
+            else:
+                if len(names) == self.__max_size:
+                    self.__heapify()
+                    raise Heap.FullHeapException
+                position[name] = len(names)
+                keys.append(k)
+                values.append(value)
+                names.append(name)
+        self.__heapify()
+
+    def items(self):
+        """
+        returns:
+            (name, value) pairs of the heap, in heap order
+        """
+        return list(zip(self.__names, self.__values))
+
+    def __heapify_up(self, hole, k, value, name):
+        """
+        moves the hole at index hole up, shifting down parents whose
+        key is bigger than k, then fills it with (k, value, name)
+        """
+        keys, values, names, position = (
+            self.__keys, self.__values, self.__names, self.__position
+        )
+
+        while hole > 0:
+            parent = (hole - 1) >> 1
+            parent_key = keys[parent]
+            if not k < parent_key:
+                break
+            keys[hole] = parent_key
+            values[hole] = values[parent]
+            parent_name = names[parent]
+            names[hole] = parent_name
+            position[parent_name] = hole
+            hole = parent
+
+        keys[hole], values[hole], names[hole] = k, value, name
+        position[name] = hole
 
     def pop(self):
-        if self.__nodes_count == 0:
+        if len(self.__names) == 0:
             raise IndexError("pop from empty heap")
         else:
-            popped_node_value, popped_node_name = self.__arr[0]
-
-            last_node_idx = self.__nodes_count - 1
-            self.__swap(0, last_node_idx)
-            self.__position[popped_node_name] = None
-            self.__arr[last_node_idx] = None
-            self.__nodes_count -= 1
+            popped_node_value = self.__values[0]
+            popped_node_name = self.__names[0]
+            del self.__position[popped_node_name]
 
-            self.__heapify_down(0)
+            # the last item refills the hole left by the root
+            last_key = self.__keys.pop()
+            last_value = self.__values.pop()
+            last_name = self.__names.pop()
+            if len(self.__names) > 0:
+                self.__heapify_down(0, last_key, last_value, last_name)
 
             return (popped_node_value, popped_node_name)
 
-    def __heapify_down(self, index):
-        parent_idx = index
-        left_child_idx = Heap.left_child_idx(index)
-        right_child_idx = Heap.right_child_idx(index)
+    def replace_root(self, name, value):
+        """
+        pops the root and inserts (name, value) with a single sift down,
+        cheaper than pop() followed by insert()
 
-        if left_child_idx >= self.__nodes_count:
-            # no childs
-            return
-        elif left_child_idx == self.__nodes_count - 1:
-            # only left child
-            smaller_child_idx = left_child_idx
+        returns:
+            (value, name) of the popped root
+        """
+        if len(self.__names) == 0:
+            raise IndexError("pop from empty heap")
         else:
-            # both right and left child
-            left_child, right_child = self.__arr[left_child_idx], self.__arr[right_child_idx]
-            smaller_child_idx = (
-                left_child_idx if self.__key(left_child) < self.__key(right_child)
-                else right_child_idx
-            )
+            popped_node_value = self.__values[0]
+            popped_node_name = self.__names[0]
+            del self.__position[popped_node_name]
 
-        parent, smaller_child = self.__arr[parent_idx], self.__arr[smaller_child_idx]
+            assert name not in self
+            self.__heapify_down(0, self.__key(value), value, name)
 
-        if self.__key(smaller_child) < self.__key(parent):
-            self.__swap(parent_idx, smaller_child_idx)
-            self.__heapify_down(smaller_child_idx)
+            return (popped_node_value, popped_node_name)
+
+    def __heapify_down(self, hole, k, value, name):
+        """
+        moves the hole at index hole down, shifting up smaller children
+        whose key is smaller than k, then fills it with (k, value, name)
+        """
+        keys, values, names, position = (
+            self.__keys, self.__values, self.__names, self.__position
+        )
+        nodes_count = len(names)
+
+        child = 2 * hole + 1
+        while child < nodes_count:
+            child_key = keys[child]
+            right = child + 1
+            if right < nodes_count:
+                right_key = keys[right]
+                if right_key < child_key:
+                    child, child_key = right, right_key
+            if not child_key < k:
+                break
+            keys[hole] = child_key
+            values[hole] = values[child]
+            child_name = names[child]
+            names[hole] = child_name
+            position[child_name] = hole
+            hole = child
+            child = 2 * hole + 1
+
+        keys[hole], values[hole], names[hole] = k, value, name
+        position[name] = hole
+
+    def __heapify(self):
+        """
+        restores the heap property over the whole array bottom-up, O(n)
+        """
+        keys, values, names = self.__keys, self.__values, self.__names
+        for i in reversed(range(len(names) // 2)):
+            self.__heapify_down(i, keys[i], values[i], names[i])
 
 
 if __name__ == "__main__":
@@ -200,4 +364,107 @@ if __name__ == "__main__":
     assert len(h) == 2
     assert h.get_root() == ((0, 14), 1)
 
+    ########################################################
+    h = Heap()
+
+    # any hashable works as a name, and the heap grows as needed
+    names = ["a", (1, 2), 10 ** 12, frozenset({3})]
+    for value, name in enumerate(reversed(names)):
+        h[name] = value
+    assert len(h) == len(names)
+    assert 10 ** 12 in h and "b" not in h
+    assert h.get_root() == (0, frozenset({3}))
+
+    h.update(name="a", value=-1)
+    assert h["a"] == -1
+    assert h.get_root() == (-1, "a")
+
+    h.update(name="a", value=100)
+    assert [h.pop()[NAME] for _ in range(len(names))] == [
+        frozenset({3}), 10 ** 12, (1, 2), "a"
+    ]
+    assert "a" not in h
+
+    from random import randint
+
+    h = Heap()
+    values = [randint(-1000, 1000) for _ in range(1000)]
+    for i, value in enumerate(values):
+        h.insert(name=i * 7919, value=value)
+    for i in range(0, len(values), 3):
+        values[i] = randint(-1000, 1000)
+        h[i * 7919] = values[i]
+    assert [h.pop()[VALUE] for _ in range(len(values))] == sorted(values)
+
+    ########################################################
+    key_calls = 0
+
+    def counting_key(value):
+        global key_calls
+        key_calls += 1
+        return value
+
+    # keys are computed once per insert or update, never while sifting
+    h = Heap(key=counting_key)
+    for i in range(100):
+        h[i] = randint(0, 1000)
+    for i in range(0, 100, 2):
+        h[i] = randint(0, 1000)
+    while len(h) > 0:
+        h.pop()
+    assert key_calls == 150
+
+    ########################################################
+    values = [randint(-1000, 1000) for _ in range(1000)]
+    h = Heap.from_items(enumerate(values))
+    assert len(h) == len(values)
+    assert h[10] == values[10]
+
+    # small batch, sifted item by item
+    h.update_many([(0, -5000), ("new", 5000)])
+    values[0] = -5000
+    values.append(5000)
+    assert h.get_root() == (-5000, 0)
+
+    # big batch, rebuilt in place
+    updates = [(i, randint(-1000, 1000)) for i in range(0, len(values) - 1, 2)]
+    h.update_many(updates)
+    for i, value in updates:
+        values[i] = value
+
+    other = Heap.from_items((-i, randint(-1000, 1000)) for i in range(1, 500))
+    h.meld(other)
+    assert len(other) == 499
+    values += [value for _, value in other.items()]
+    assert [h.pop()[VALUE] for _ in range(len(values))] == sorted(values)
+
+    # heaps with different keys are melded through their values
+    h = Heap.from_items([("a", 1), ("b", 3), ("a", 5)], key=lambda v: -v)
+    assert len(h) == 2 and h["a"] == 5
+    h.meld(Heap.from_items([("b", 4), ("c", 2)]))
+    assert [h.pop() for _ in range(3)] == [(5, "a"), (4, "b"), (2, "c")]
+
+    try:
+        Heap.from_items(enumerate(range(3)), max_size=2)
+        assert False is True
+    except Heap.FullHeapException:
+        pass
+
+    ########################################################
+    h = Heap.from_items([("a", 3), ("b", 1), ("c", 2)])
+    assert h.replace_root("d", 4) == (1, "b")
+    assert "b" not in h and len(h) == 3
+    assert h.replace_root("b", 0) == (2, "c")
+    assert [h.pop() for _ in range(3)] == [(0, "b"), (3, "a"), (4, "d")]
+
+    ########################################################
+    h = Heap(max_size=2)
+    h["x"], h["y"] = 1, 2
+    h["x"] = 3  # updates are allowed on a full heap
+    try:
+        h["z"] = 0
+        assert False is True
+    except Heap.FullHeapException:
+        pass
+
     print("all tests successful")
@@ -0,0 +1,153 @@
+"""
+Heap benchmark
+
+Compares heap.Heap against the previous recursive implementation
+(kept below as RecursiveHeap) and against the standard heapq module.
+
+usage:
+    python3 heap_benchmark.py [n]
+"""
+
+import heapq
+from random import random, seed
+from sys import argv
+from time import perf_counter
+
+from heap import Heap
+
+
+class RecursiveHeap:
+    """
+    reference copy of the recursive, tuple-swapping Heap
+    that heap.Heap replaced, only used for comparison
+    """
+
+    def __init__(self, max_size, key=lambda item: item):
+        self.__nodes_count = 0
+        self.__arr = [None for _ in range(max_size)]
+        self.__position = [None for _ in range(max_size)]
+        self.__key = lambda item: key(item[0])
+
+    def __contains__(self, name):
+        return self.__position[name] is not None
+
+    def __len__(self):
+        return self.__nodes_count
+
+    def __swap(self, i, j):
+        _, ith_node_name = self.__arr[i]
+        _, jth_node_name = self.__arr[j]
+        self.__arr[i], self.__arr[j] = self.__arr[j], self.__arr[i]
+        self.__position[ith_node_name], self.__position[jth_node_name] = j, i
+
+    def __setitem__(self, name, value):
+        if name not in self:
+            self.__arr[self.__nodes_count] = (value, name)
+            self.__position[name] = self.__nodes_count
+            self.__heapify_up(self.__nodes_count)
+            self.__nodes_count += 1
+        else:
+            i = self.__position[name]
+            self.__arr[i] = (value, name)
+            self.__heapify_up(i)
+            self.__heapify_down(i)
+
+    def __heapify_up(self, child_idx):
+        parent_idx = (child_idx - 1) // 2
+        child, parent = self.__arr[child_idx], self.__arr[parent_idx]
+        if child_idx > 0 and self.__key(child) < self.__key(parent):
+            self.__swap(child_idx, parent_idx)
+            self.__heapify_up(parent_idx)
+
+    def pop(self):
+        popped = self.__arr[0]
+        last_node_idx = self.__nodes_count - 1
+        self.__swap(0, last_node_idx)
+        self.__position[popped[1]] = None
+        self.__arr[last_node_idx] = None
+        self.__nodes_count -= 1
+        self.__heapify_down(0)
+        return popped
+
+    def __heapify_down(self, parent_idx):
+        left_child_idx = 2 * parent_idx + 1
+        right_child_idx = left_child_idx + 1
+        if left_child_idx >= self.__nodes_count:
+            return
+        elif left_child_idx == self.__nodes_count - 1:
+            smaller_child_idx = left_child_idx
+        else:
+            smaller_child_idx = (
+                left_child_idx
+                if self.__key(self.__arr[left_child_idx])
+                < self.__key(self.__arr[right_child_idx])
+                else right_child_idx
+            )
+        if self.__key(self.__arr[smaller_child_idx]) < self.__key(self.__arr[parent_idx]):
+            self.__swap(parent_idx, smaller_child_idx)
+            self.__heapify_down(smaller_child_idx)
+
+
+def indexed_workload(make_heap, values, updates):
+    """
+    inserts every value, applies the (name, value) updates, pops everything
+    """
+    h = make_heap(len(values))
+    for name, value in enumerate(values):
+        h[name] = value
+    for name, value in updates:
+        h[name] = value
+    return [h.pop()[0] for _ in range(len(values))]
+
+
+def heapq_workload(values, updates):
+    """
+    same workload with heapq, updates are lazy re-pushes
+    and stale entries are skipped on pop
+    """
+    current = list(values)
+    h = [(value, name) for name, value in enumerate(values)]
+    heapq.heapify(h)
+    for name, value in updates:
+        current[name] = value
+        heapq.heappush(h, (value, name))
+    result = []
+    while h:
+        value, name = heapq.heappop(h)
+        if current[name] == value:
+            current[name] = None
+            result.append(value)
+    return result
+
+
+def timed(f, *args):
+    start = perf_counter()
+    result = f(*args)
+    return perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    n = int(argv[1]) if len(argv) > 1 else 10_000
+
+    seed(0)
+    values = [random() for _ in range(n)]
+    updates = [(name, values[name] / 2) for name in range(0, n, 4)]
+
+    expected = list(values)
+    for name, value in updates:
+        expected[name] = value
+    expected.sort()
+
+    runs = [
+        ("RecursiveHeap", lambda: indexed_workload(RecursiveHeap, values, updates)),
+        ("Heap", lambda: indexed_workload(lambda _: Heap(), values, updates)),
+        ("heapq", lambda: heapq_workload(values, updates)),
+    ]
+
+    print(f"n = {n}, {len(updates)} decrease-keys")
+    baseline = None
+    for name, run in runs:
+        elapsed, result = timed(run)
+        assert result == expected
+        baseline = baseline or elapsed
+        print(f"{name:>14}: {elapsed:.4f}s ({baseline / elapsed:.2f}x)")
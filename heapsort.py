@@ -4,16 +4,33 @@ https://www.wikiwand.com/en/Heapsort
 """
 
 
-from heap import Heap
+def heapsorted(arr, reverse=False, key=None, queue=None):
+    """
+    arguments:
+        arr: list to sort
+        reverse: sort in descending order
+        key: function applied to items to compare them
+        queue: priority queue class (see heap.PriorityQueue),
+            None (default) sorts a copy of arr in place with heapsort()
+
+    returns:
+        new sorted list
+    """
+    if queue is None:
+        result = list(arr)
+        heapsort(result, key=key, reverse=reverse)
+        return result
 
-
-def heapsorted(arr, reverse=False, key=lambda item: item):
     n = len(arr)
+    key_arg = {} if key is None else {"key": key}
 
-    h = Heap(max_size=n, key=key)
-
-    for i in range(n):
-        h.insert(name=i, value=arr[i])
+    if hasattr(queue, "from_items"):
+        # O(n) bottom-up construction
+        h = queue.from_items(enumerate(arr), **key_arg)
+    else:
+        h = queue(**key_arg)
+        for i in range(n):
+            h.insert(name=i, value=arr[i])
 
     result = [h.pop() for _ in range(n)]
 
@@ -23,6 +40,88 @@ def heapsorted(arr, reverse=False, key=lambda item: item):
     return [value for value, _ in result]
 
 
+def heapsort(arr, key=None, reverse=False, stable=False):
+    """
+    sorts arr in place, inside its own buffer
+
+    arguments:
+        arr: mutable sequence, e.g. list or array.array
+        key: function applied to items to compare them
+        reverse: sort in descending order
+        stable: keep equal items in their original order,
+            this needs O(n) extra memory for the decorated items
+
+    O(n log n) time, O(1) extra memory when not stable
+    """
+    n = len(arr)
+
+    if stable:
+        # (key, index) pairs are all distinct, so any order on them
+        # is stable; the index is negated when reversing so that
+        # equal items still come out in their original order
+        sign = -1 if reverse else 1
+        if key is None:
+            decorated = [(arr[i], sign * i) for i in range(n)]
+        else:
+            decorated = [(key(arr[i]), sign * i) for i in range(n)]
+        heapsort(decorated, reverse=reverse)
+        original = list(arr)
+        for i in range(n):
+            arr[i] = original[sign * decorated[i][1]]
+        return
+
+    # bottom-up max-heap construction, O(n)
+    for i in reversed(range(n // 2)):
+        _sift_down(arr, i, n, key)
+
+    # move the max to the end and shrink the heap
+    for end in reversed(range(1, n)):
+        arr[0], arr[end] = arr[end], arr[0]
+        _sift_down(arr, 0, end, key)
+
+    if reverse:
+        arr.reverse()
+
+
+def _sift_down(arr, hole, end, key):
+    """
+    sifts arr[hole] down the max-heap arr[:end], moving the hole
+    """
+    item = arr[hole]
+
+    if key is None:
+        child = 2 * hole + 1
+        while child < end:
+            child_item = arr[child]
+            right = child + 1
+            if right < end and child_item < arr[right]:
+                child, child_item = right, arr[right]
+            if not item < child_item:
+                break
+            arr[hole] = child_item
+            hole = child
+            child = 2 * hole + 1
+    else:
+        # without extra memory keys can't be cached for the whole array,
+        # only the key of the item being sifted is computed once
+        item_key = key(item)
+        child = 2 * hole + 1
+        while child < end:
+            child_key = key(arr[child])
+            right = child + 1
+            if right < end:
+                right_key = key(arr[right])
+                if child_key < right_key:
+                    child, child_key = right, right_key
+            if not item_key < child_key:
+                break
+            arr[hole] = arr[child]
+            hole = child
+            child = 2 * hole + 1
+
+    arr[hole] = item
+
+
 if __name__ == "__main__":
     arr = [-1, 3, 10, 99, 0, 0, 0, -42]
     assert heapsorted(arr) == sorted(arr)
@@ -50,4 +149,38 @@ if __name__ == "__main__":
     ]
     assert heapsorted(arr, key=_key) == sorted(arr, key=_key)
 
+    ########################################################
+    from dary_heap import DaryHeap
+    from heap import Heap
+    from pairing_heap import PairingHeap
+    from radix_heap import RadixHeap
+
+    for queue in [Heap, DaryHeap, PairingHeap]:
+        assert heapsorted(arr, key=_key, queue=queue) == sorted(arr, key=_key)
+        assert heapsorted([-1, 3, 0, -42], queue=queue) == [-42, -1, 0, 3]
+
+    arr = [5, 3, 99, 0, 3, 1024, 7]
+    assert heapsorted(arr, reverse=True, queue=RadixHeap) == sorted(arr, reverse=True)
+
+    ########################################################
+    from array import array
+    from random import randint
+
+    for _ in range(100):
+        arr = [randint(-50, 50) for _ in range(randint(0, 200))]
+
+        buffer = array("i", arr)
+        heapsort(buffer)
+        assert list(buffer) == sorted(arr)
+
+        buffer = list(arr)
+        heapsort(buffer, key=abs, reverse=True)
+        assert [abs(x) for x in buffer] == sorted(map(abs, arr), reverse=True)
+
+        tasks = [(i, randint(0, 5)) for i in range(len(arr))]
+        for reverse in [False, True]:
+            buffer = list(tasks)
+            heapsort(buffer, key=_key, reverse=reverse, stable=True)
+            assert buffer == sorted(tasks, key=_key, reverse=reverse)
+
     print("all tests successful")
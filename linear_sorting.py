@@ -11,27 +11,287 @@ Sort v as fast as possible (in particular, beat O(n log n)).
 """
 
 
+import mmap
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from os import cpu_count
+
+
 def linearly_sorted(v, domain=3):
+    if len(v) == 0:
+        return []
+
+    # a single bounds check instead of one per item
+    assert 0 <= min(v) and max(v) < domain
+
     counts = [0 for _ in range(domain)]
 
     for item in v:
-        assert item in range(domain)
         counts[item] += 1
 
-    result = [None for _ in range(len(v))]
-
-    next_idx = 0
+    result = []
 
     for domain_value in range(domain):
-        for _ in range(counts[domain_value]):
-            result[next_idx] = domain_value
-            next_idx += 1
+        result += [domain_value] * counts[domain_value]
+
+    assert len(result) == len(v)
+
+    return result
+
+
+def counting_sorted(items, domain, key=None):
+    """
+    stable counting sort, O(n + domain)
+
+    arguments:
+        items: list to sort
+        domain: key(item) is an integer in range(domain) for every item
+        key: function applied to items, None sorts the items themselves
+
+    returns:
+        new list, items with equal keys keep their original order
+    """
+    keys = list(items) if key is None else [key(item) for item in items]
+
+    counts = [0 for _ in range(domain + 1)]
+    for k in keys:
+        counts[k + 1] += 1
+
+    # counts[k] becomes the first output position of key k
+    for k in range(domain):
+        counts[k + 1] += counts[k]
+
+    result = [None for _ in range(len(keys))]
+    for item, k in zip(items, keys):
+        result[counts[k]] = item
+        counts[k] += 1
+
+    return result
+
+
+def radix_bits(n, bits):
+    """
+    returns:
+        r: digit width minimizing the LSD radix sort cost of n keys
+            of the given bits, passes * (n + 2 ** r) with passes = ceil(bits / r)
+    """
+    if bits == 0:
+        return 1
+    return min(
+        range(1, 17),
+        key=lambda r: (-(-bits // r) * (n + (1 << r)), r),
+    )
+
+
+def radix_sorted(arr, key=None, digit_bits=None):
+    """
+    LSD radix sort of integers of any sign and size (e.g. 32- or 64-bit
+    ids and timestamps), O(passes * (n + 2 ** digit_bits))
+
+    arguments:
+        arr: list, or array.array of integers
+        key: function returning the integer to sort items by,
+            None sorts the integers themselves
+        digit_bits: bits per pass, None picks them with radix_bits()
+
+    returns:
+        new sorted list (stable), array.array with the same typecode
+        for array.array inputs
+
+    lists go through lists of buckets; array.array inputs sorted by
+    themselves go through _radix_sorted_array() instead, which keeps
+    8 bytes per item rather than a Python int and a list slot
+    """
+    n = len(arr)
+    if n == 0:
+        return array(arr.typecode) if isinstance(arr, array) else []
+    if key is None and isinstance(arr, array):
+        return _radix_sorted_array(arr, digit_bits)
+
+    keys = arr if key is None else [key(item) for item in arr]
+
+    # shifting by the minimum makes every key non-negative
+    lowest = min(keys)
+    bits = (max(keys) - lowest).bit_length()
+    r = digit_bits or radix_bits(n, bits)
+    mask = (1 << r) - 1
+
+    if key is None:
+        # the integers themselves go through the buckets
+        index_bits = 0
+        packed = [k - lowest for k in keys]
+    else:
+        # each item's index is packed below its key, so a single int
+        # carries both and the items are gathered once at the end
+        index_bits = (n - 1).bit_length()
+        packed = [(k - lowest) << index_bits | i for i, k in enumerate(keys)]
+
+    for shift in range(index_bits, index_bits + bits, r):
+        buckets = [[] for _ in range(mask + 1)]
+        appends = [bucket.append for bucket in buckets]
+        for x in packed:
+            appends[(x >> shift) & mask](x)
+        packed = list(chain.from_iterable(buckets))
+
+    if key is None:
+        result = [x + lowest for x in packed]
+    else:
+        index_mask = (1 << index_bits) - 1
+        result = [arr[x & index_mask] for x in packed]
+
+    return array(arr.typecode, result) if isinstance(arr, array) else result
+
+
+def _radix_sorted_array(arr, digit_bits):
+    """
+    radix_sorted() of a non-empty array.array of integers: every pass is
+    a counting sort from one array("Q") buffer into another, placing each
+    item at the next free slot of its digit, with the counts in an array too
+    """
+    n = len(arr)
+    lowest = min(arr)
+    bits = (max(arr) - lowest).bit_length()
+    r = digit_bits or radix_bits(n, bits)
+    mask = (1 << r) - 1
 
-    assert next_idx == len(v)
+    # shifted by the minimum, any 64-bit integers fit in unsigned 64 bits
+    source = array("Q", (x - lowest for x in arr))
+    target = array("Q", bytes(8 * n))
 
+    for shift in range(0, bits, r):
+        # starts[d] is the first slot of digit d in target
+        starts = array("q", bytes(8 * (mask + 2)))
+        for x in source:
+            starts[((x >> shift) & mask) + 1] += 1
+        for d in range(mask):
+            starts[d + 1] += starts[d]
+        for x in source:
+            d = (x >> shift) & mask
+            target[starts[d]] = x
+            starts[d] += 1
+        source, target = target, source
+
+    return array(arr.typecode, (x + lowest for x in source))
+
+
+def radix_sorted_bytes(strings, width=None):
+    """
+    LSD radix sort of fixed-width byte strings, one byte per pass,
+    O(width * (n + 256))
+
+    arguments:
+        strings: list of bytes, all of the same length
+        width: length of the strings, None reads it from the first one
+
+    returns:
+        new list sorted lexicographically (stable)
+    """
+    if len(strings) == 0:
+        return []
+    if width is None:
+        width = len(strings[0])
+    assert all(len(s) == width for s in strings)
+
+    result = list(strings)
+    for position in reversed(range(width)):
+        result = counting_sorted(result, 256, key=lambda s: s[position])
     return result
 
 
+def counting_sort_file(
+    input_path,
+    output_path,
+    domain=256,
+    typecode="B",
+    workers=None,
+    block_size=2 ** 20,
+):
+    """
+    counting sort of a binary file of small-domain codes
+    (e.g. status bytes), without loading it in memory
+
+    the input is memory-mapped, worker processes count one slice each,
+    the histograms are merged and the output file is memory-mapped and
+    filled with runs of equal codes;
+    memory is O(domain * workers + block_size) plus the OS page cache
+
+    arguments:
+        input_path: file of fixed-size unsigned codes
+        output_path: file to write the sorted codes to
+        domain: every code is in range(domain)
+        typecode: array typecode of the codes, "B" (1 byte) or "H" (2 bytes)
+        workers: number of worker processes, None uses every core
+        block_size: bytes written to the output at once
+
+    returns:
+        counts: list, counts[c] is the number of occurrences of code c
+    """
+    assert typecode in ("B", "H")
+    itemsize = array(typecode).itemsize
+    workers = workers or cpu_count() or 1
+
+    with open(input_path, "rb") as f:
+        size = f.seek(0, 2)
+    assert size % itemsize == 0
+    n = size // itemsize
+
+    bounds = [(n * i // workers, n * (i + 1) // workers) for i in range(workers)]
+    if n == 0:
+        histograms = []
+    elif workers == 1:
+        histograms = [_file_histogram(input_path, typecode, domain, 0, n)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            histograms = list(pool.map(
+                _file_histogram,
+                [input_path] * workers,
+                [typecode] * workers,
+                [domain] * workers,
+                [lo for lo, _ in bounds],
+                [hi for _, hi in bounds],
+            ))
+
+    counts = [sum(histogram[c] for histogram in histograms) for c in range(domain)]
+
+    with open(output_path, "w+b") as f:
+        f.truncate(size)
+        if size == 0:
+            return counts
+        with mmap.mmap(f.fileno(), size) as out:
+            position = 0
+            for code in range(domain):
+                remaining = counts[code] * itemsize
+                block = array(typecode, [code]).tobytes() * min(
+                    counts[code], max(1, block_size // itemsize)
+                )
+                while remaining > 0:
+                    length = min(remaining, len(block))
+                    out[position:position + length] = block[:length]
+                    position += length
+                    remaining -= length
+            assert position == size
+
+    return counts
+
+
+def _file_histogram(input_path, typecode, domain, lo, hi):
+    """
+    returns:
+        counts of the codes lo, ..., hi - 1 of the memory-mapped file
+    """
+    with open(input_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            codes = memoryview(m).cast(typecode)
+            # Counter counts the view in C, no list of codes is built
+            counter = Counter(codes[lo:hi])
+            codes.release()
+
+    assert all(0 <= code < domain for code in counter)
+    return [counter[code] for code in range(domain)]
+
+
 if __name__ == "__main__":
     from random import randint
 
@@ -61,4 +321,67 @@ if __name__ == "__main__":
     ]:
         assert linearly_sorted(v) == sorted(v)
 
+    ########################################################
+    def _key(task): return task[1]
+
+    tasks = [(i, randint(0, 9)) for i in range(500)]
+    assert counting_sorted(tasks, 10, key=_key) == sorted(tasks, key=_key)
+    assert counting_sorted([3, 0, 2, 0], 4) == [0, 0, 2, 3]
+    assert counting_sorted([], 4) == []
+
+    for bits in [8, 32, 64]:
+        for _ in range(20):
+            v = [randint(-2 ** (bits - 1), 2 ** (bits - 1) - 1) for _ in range(randint(0, 500))]
+            assert radix_sorted(v) == sorted(v)
+            assert radix_sorted(v, digit_bits=randint(1, 16)) == sorted(v)
+
+            typed = array("q", v)
+            result = radix_sorted(typed)
+            assert isinstance(result, array) and list(result) == sorted(v)
+            result = radix_sorted(typed, digit_bits=randint(1, 16))
+            assert result.typecode == "q" and list(result) == sorted(v)
+
+    for typecode in ["b", "H", "i", "Q"]:
+        top = 2 ** (8 * array(typecode).itemsize) - 1
+        lo, hi = (0, top) if typecode.isupper() else (-(top + 1) // 2, top // 2)
+        v = [randint(lo, hi) for _ in range(300)] + [lo, hi]
+        result = radix_sorted(array(typecode, v))
+        assert result.typecode == typecode and list(result) == sorted(v)
+    assert radix_sorted(array("l", [7])) == array("l", [7])
+
+    timestamps = [(f"event{i}", randint(1_600_000_000, 1_700_000_000)) for i in range(300)]
+    assert radix_sorted(timestamps, key=_key) == sorted(timestamps, key=_key)
+    assert radix_sorted([5, 5, 5]) == [5, 5, 5]
+    assert radix_sorted([]) == []
+
+    assert radix_bits(10 ** 7, 64) > radix_bits(100, 64)
+
+    strings = [bytes(randint(0, 255) for _ in range(6)) for _ in range(300)]
+    assert radix_sorted_bytes(strings) == sorted(strings)
+    assert radix_sorted_bytes([b"ba", b"ab", b"aa"]) == [b"aa", b"ab", b"ba"]
+
+    from tempfile import TemporaryDirectory
+    from os import path
+
+    with TemporaryDirectory() as directory:
+        input_path = path.join(directory, "codes")
+        output_path = path.join(directory, "sorted")
+
+        for typecode, domain in [("B", 5), ("B", 256), ("H", 1000)]:
+            for workers in [1, 3]:
+                codes = array(typecode, (randint(0, domain - 1) for _ in range(randint(0, 5000))))
+                with open(input_path, "wb") as f:
+                    codes.tofile(f)
+
+                counts = counting_sort_file(
+                    input_path, output_path, domain=domain,
+                    typecode=typecode, workers=workers, block_size=64,
+                )
+                assert sum(counts) == len(codes)
+
+                result = array(typecode)
+                with open(output_path, "rb") as f:
+                    result.frombytes(f.read())
+                assert list(result) == sorted(codes)
+
     print("all tests successful")
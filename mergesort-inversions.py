@@ -4,60 +4,295 @@ https://www.wikiwand.com/en/Merge_sort
 
 Inversion (discrete mathematics)
 https://www.wikiwand.com/en/Inversion_(discrete_mathematics)
+
+Timsort (natural runs and galloping)
+https://www.wikiwand.com/en/Timsort
 """
 
+# runs shorter than this are extended with binary insertion sort
+MIN_RUN = 32
+
+# consecutive picks from one side before switching to galloping
+MIN_GALLOP = 7
 
-def inversions(arr):
-    _, result = sorted_inversions(arr)
+
+def inversions(arr, adaptive=False):
+    _, result = (adaptive_sorted_inversions if adaptive else sorted_inversions)(arr)
     return result
 
 
-def mergesorted(arr):
-    result, _ = sorted_inversions(arr)
+def mergesorted(arr, adaptive=False):
+    result, _ = (adaptive_sorted_inversions if adaptive else sorted_inversions)(arr)
     return result
 
 
-# O(n log n)
+# O(n log n), bottom-up with a single reusable buffer
 def sorted_inversions(arr):
     n = len(arr)
-    if n <= 1:
-        return arr, 0
-    else:
-        sorted_l, inversions_l = sorted_inversions(arr[: n // 2])
-        sorted_r, inversions_r = sorted_inversions(arr[n // 2 :])
+    src = list(arr)
+    dst = [None for _ in range(n)]
+    inversions = 0
 
-        sorted_arr, inversions_merge = merge_inversions(sorted_l, sorted_r)
-        return sorted_arr, inversions_l + inversions_r + inversions_merge
+    # merge adjacent sorted runs of length width, doubling width every pass
+    width = 1
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            inversions += merge_into(src, lo, mid, hi, dst)
+        src, dst = dst, src
+        width *= 2
 
+    return src, inversions
 
-# O(n)
-def merge_inversions(l, r):
-    arr = []
-    inversions = 0
 
-    i_l, i_r = 0, 0
-    while i_l < len(l) and i_r < len(r):
-        if r[i_r] < l[i_l]:
-            inversions += 1
-            arr.append(r[i_r])
+# O(hi - lo)
+def merge_into(src, lo, mid, hi, dst):
+    """
+    merges the sorted runs src[lo:mid] and src[mid:hi] into dst[lo:hi]
+
+    returns:
+        inversions: number of pairs (i, j) with i in the left run,
+            j in the right run and src[j] < src[i]
+    """
+    inversions = 0
+    i_l, i_r, k = lo, mid, lo
+    while i_l < mid and i_r < hi:
+        if src[i_r] < src[i_l]:
+            # src[i_r] is smaller than every remaining left item
+            inversions += mid - i_l
+            dst[k] = src[i_r]
             i_r += 1
         else:
-            arr.append(l[i_l])
+            dst[k] = src[i_l]
             i_l += 1
+        k += 1
+
+    dst[k:k + mid - i_l] = src[i_l:mid]
+    k += mid - i_l
+    dst[k:k + hi - i_r] = src[i_r:hi]
+
+    return inversions
+
+
+# O(n)
+def merge_inversions(l, r):
+    arr = l + r
+    dst = [None for _ in range(len(arr))]
+    inversions = merge_into(arr, 0, len(l), len(arr), dst)
+    return dst, inversions
+
+
+# O(n) on presorted inputs, O(n log n) in the worst case
+def adaptive_sorted_inversions(arr):
+    """
+    natural mergesort: existing ascending and strictly descending runs
+    are found, then merged by run length with galloping, as in Timsort
+    """
+    arr = list(arr)
+    n = len(arr)
+    inversions = 0
+
+    # stack of (start, length) of the pending sorted runs
+    runs = []
 
-    for i in range(i_l, len(l)):
-        arr.append(l[i])
+    lo = 0
+    while lo < n:
+        hi, run_inversions = _next_run(arr, lo, n)
+        inversions += run_inversions
+        runs.append((lo, hi - lo))
+        inversions += _merge_collapse(arr, runs)
+        lo = hi
 
-    for i in range(i_r, len(r)):
-        arr.append(r[i])
+    while len(runs) > 1:
+        inversions += _merge_at(arr, runs, len(runs) - 2)
 
     return arr, inversions
 
 
+def _next_run(arr, lo, n):
+    """
+    sorts in place the natural run starting at lo,
+    extended to MIN_RUN items with binary insertion sort
+
+    returns:
+        hi: end of the run
+        inversions: inversions within arr[lo:hi]
+    """
+    hi = lo + 1
+    inversions = 0
+    if hi == n:
+        return hi, inversions
+
+    if arr[hi] < arr[lo]:
+        # strictly descending, so every pair is an inversion
+        while hi + 1 < n and arr[hi + 1] < arr[hi]:
+            hi += 1
+        hi += 1
+        arr[lo:hi] = arr[lo:hi][::-1]
+        inversions += (hi - lo) * (hi - lo - 1) // 2
+    else:
+        while hi + 1 < n and not arr[hi + 1] < arr[hi]:
+            hi += 1
+        hi += 1
+
+    end = min(lo + MIN_RUN, n)
+    while hi < end:
+        # binary insertion, every bigger item shifted is an inversion
+        item = arr[hi]
+        i = _gallop_right(item, arr, lo, hi)
+        arr[i + 1:hi + 1] = arr[i:hi]
+        arr[i] = item
+        inversions += hi - i
+        hi += 1
+
+    return hi, inversions
+
+
+def _merge_collapse(arr, runs):
+    """
+    merges runs on top of the stack until their lengths satisfy
+    len[i - 2] > len[i - 1] + len[i] and len[i - 1] > len[i],
+    which keeps the stack O(log n) deep and the merges balanced
+
+    returns:
+        inversions counted by the merges
+    """
+    inversions = 0
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if (
+            (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1])
+            or (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1])
+        ):
+            if runs[i - 1][1] < runs[i + 1][1]:
+                i -= 1
+        elif runs[i][1] > runs[i + 1][1]:
+            break
+        inversions += _merge_at(arr, runs, i)
+    return inversions
+
+
+def _merge_at(arr, runs, i):
+    """
+    merges the adjacent runs runs[i] and runs[i + 1]
+
+    returns:
+        inversions between the two runs
+    """
+    lo, left_len = runs[i]
+    _, right_len = runs[i + 1]
+    runs[i] = (lo, left_len + right_len)
+    del runs[i + 1]
+    return _gallop_merge(arr, lo, lo + left_len, lo + left_len + right_len)
+
+
+def _gallop_right(x, a, lo, hi):
+    """
+    returns:
+        first index i in [lo, hi) with x < a[i] (hi if none),
+        probing lo + 1, lo + 3, lo + 7, ... before bisecting
+    """
+    step, last = 1, lo
+    while lo < hi and not x < a[lo]:
+        last = lo
+        lo = min(lo + step, hi)
+        step *= 2
+    # a[last] <= x (or last is the original lo), a[lo] > x (or lo == hi)
+    lo, hi = last, lo
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if x < a[mid]:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def _gallop_left(x, a, lo, hi):
+    """
+    returns:
+        first index i in [lo, hi) with x <= a[i] (hi if none),
+        probing lo + 1, lo + 3, lo + 7, ... before bisecting
+    """
+    step, last = 1, lo
+    while lo < hi and a[lo] < x:
+        last = lo
+        lo = min(lo + step, hi)
+        step *= 2
+    lo, hi = last, lo
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if a[mid] < x:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _gallop_merge(arr, lo, mid, hi):
+    """
+    merges the sorted runs arr[lo:mid] and arr[mid:hi] in place,
+    using a copy of the (trimmed) left run as buffer
+
+    returns:
+        inversions between the two runs
+    """
+    # left items not bigger than the smallest right item are in place,
+    # and so are right items not smaller than the biggest left item
+    lo = _gallop_right(arr[mid], arr, lo, mid)
+    if lo == mid:
+        return 0
+    hi = _gallop_left(arr[mid - 1], arr, mid, hi)
+
+    left = arr[lo:mid]
+    n_left = len(left)
+    i, j, k = 0, mid, lo
+    inversions = 0
+    left_wins = right_wins = 0
+
+    while i < n_left and j < hi:
+        if arr[j] < left[i]:
+            if right_wins >= MIN_GALLOP:
+                # every right item smaller than left[i] at once
+                end = _gallop_left(left[i], arr, j, hi)
+                count = end - j
+                arr[k:k + count] = arr[j:end]
+                right_wins = 0
+            else:
+                count, end = 1, j + 1
+                arr[k] = arr[j]
+                right_wins += 1
+                left_wins = 0
+            # each of them is smaller than the remaining left items
+            inversions += count * (n_left - i)
+            j, k = end, k + count
+        else:
+            if left_wins >= MIN_GALLOP:
+                # every left item not bigger than arr[j] at once
+                end = _gallop_right(arr[j], left, i, n_left)
+                arr[k:k + end - i] = left[i:end]
+                left_wins = 0
+            else:
+                end = i + 1
+                arr[k] = left[i]
+                left_wins += 1
+                right_wins = 0
+            k += end - i
+            i = end
+
+    # the remaining right items are already in place
+    arr[k:k + n_left - i] = left[i:]
+
+    return inversions
+
+
 if __name__ == "__main__":
     assert inversions([5, 7, 6]) == 1
     assert inversions([2, 4, 9]) == 0
     assert inversions([7, 6, 3]) == 3
+    assert inversions([3, 4, 5, 1, 2]) == 6
+    assert merge_inversions([3, 4, 5], [1, 2]) == ([1, 2, 3, 4, 5], 6)
 
     arr = [-1, 3, 10, 99, 0, 0, 0, -42]
     assert mergesorted(arr) == sorted(arr)
@@ -77,5 +312,26 @@ if __name__ == "__main__":
         ]
 
         assert mergesorted(v) == sorted(v)
+        assert mergesorted(v, adaptive=True) == sorted(v)
+
+    def brute_force(v):
+        return sum(
+            1 for i in range(len(v)) for j in range(i + 1, len(v)) if v[j] < v[i]
+        )
+
+    for _ in range(RANDOM_TESTS_COUNT):
+        v = [randint(-10, 10) for _ in range(randint(0, 300))]
+        assert inversions(v) == inversions(v, adaptive=True) == brute_force(v)
+
+        # concatenated ascending and descending runs, with some noise
+        v = []
+        for _ in range(randint(0, 10)):
+            run = sorted(randint(-1000, 1000) for _ in range(randint(0, 100)))
+            v += run if randint(0, 1) else run[::-1]
+        for _ in range(randint(0, 5)):
+            if v:
+                v[randint(0, len(v) - 1)] = randint(-1000, 1000)
+        assert mergesorted(v, adaptive=True) == sorted(v)
+        assert inversions(v, adaptive=True) == inversions(v)
 
     print("all tests successful")
@@ -0,0 +1,54 @@
+"""
+Mergesort benchmark
+
+Compares the halving mergesort with the natural-run adaptive one
+(see mergesort-inversions.py) on sorted, reversed, nearly sorted
+and random inputs.
+
+usage:
+    python3 mergesort_benchmark.py [n]
+"""
+
+from importlib import import_module
+from random import randint, random, seed
+from sys import argv
+from time import perf_counter
+
+mergesort = import_module("mergesort-inversions")
+
+
+def with_noise(arr, swaps):
+    arr = list(arr)
+    for _ in range(swaps):
+        i, j = randint(0, len(arr) - 1), randint(0, len(arr) - 1)
+        arr[i], arr[j] = arr[j], arr[i]
+    return arr
+
+
+if __name__ == "__main__":
+    n = int(argv[1]) if len(argv) > 1 else 20_000
+
+    seed(0)
+    inputs = [
+        ("sorted", list(range(n))),
+        ("reversed", list(range(n, 0, -1))),
+        ("sorted + 1% swaps", with_noise(range(n), n // 100)),
+        ("appended sorted logs", sorted(random() for _ in range(n // 2)) * 2),
+        ("random", [random() for _ in range(n)]),
+    ]
+
+    print(f"n = {n}")
+    for input_name, arr in inputs:
+        start = perf_counter()
+        expected, expected_inversions = mergesort.sorted_inversions(arr)
+        halving = perf_counter() - start
+
+        start = perf_counter()
+        result, result_inversions = mergesort.adaptive_sorted_inversions(arr)
+        adaptive = perf_counter() - start
+
+        assert result == expected and result_inversions == expected_inversions
+        print(
+            f"{input_name:>21}: halving {halving:.4f}s, "
+            f"adaptive {adaptive:.4f}s ({halving / adaptive:.2f}x)"
+        )
@@ -0,0 +1,216 @@
+"""
+Pairing heap
+https://www.wikiwand.com/en/Pairing_heap
+
+A heap-ordered multiway tree: insert and decrease-key are O(1)
+(a single link with the root), pop is O(log n) amortized
+thanks to the two-pass pairing of the root's children.
+"""
+
+from heap import Heap
+
+
+class PairingHeap:
+    """
+    name-value min-heap as a pairing heap,
+    same interface as heap.Heap (see heap.PriorityQueue)
+    """
+
+    class Node:
+        __slots__ = ("key", "value", "name", "child", "sibling", "prev")
+
+        def __init__(self, key, value, name):
+            self.key = key
+            self.value = value
+            self.name = name
+            self.child = None  # leftmost child
+            self.sibling = None  # next sibling to the right
+            self.prev = None  # left sibling, or parent for a leftmost child
+
+    def __init__(self, max_size=None, key=lambda item: item):
+        """
+        arguments:
+            max_size: maximum number of items the heap can hold,
+                None (default) lets the heap grow as needed
+            key: function applied to values to compare them
+        """
+        self.__max_size = max_size
+        self.__root = None
+
+        # self.__nodes[name] will be the tree node of the item with that name
+        self.__nodes = {}
+
+        self.__key = key
+
+    def __contains__(self, name):
+        return name in self.__nodes
+
+    def __getitem__(self, name):
+        if len(self.__nodes) == 0:
+            raise IndexError("empty heap")
+        elif name not in self:
+            raise KeyError(name)
+        else:
+            return self.__nodes[name].value
+
+    def get_root(self):
+        if self.__root is None:
+            raise IndexError("pop from empty heap")
+        else:
+            return (self.__root.value, self.__root.name)
+
+    def __len__(self):
+        return len(self.__nodes)
+
+    def __str__(self):
+        return f"{[(node.value, name) for name, node in self.__nodes.items()]}"
+
+    def __setitem__(self, name, value):
+        k = self.__key(value)
+        if name not in self.__nodes:
+            if len(self.__nodes) == self.__max_size:
+                raise Heap.FullHeapException
+            node = PairingHeap.Node(k, value, name)
+            self.__nodes[name] = node
+            self.__root = self.__link(self.__root, node)
+        else:
+            node = self.__nodes[name]
+            decrease = k < node.key
+            node.key, node.value = k, value
+            if node is self.__root:
+                if not decrease:
+                    # the root may no longer be the smallest
+                    self.__root = self.__pair(node.child)
+                    node.child = None
+                    if self.__root is not None:
+                        self.__root.prev = None
+                    self.__root = self.__link(self.__root, node)
+            elif decrease:
+                # cut the subtree and link it back with the root
+                self.__cut(node)
+                self.__root = self.__link(self.__root, node)
+            else:
+                # move node's children up and reinsert node alone
+                self.__cut(node)
+                children = self.__pair(node.child)
+                node.child = None
+                self.__root = self.__link(self.__root, children)
+                self.__root = self.__link(self.__root, node)
+
+    def insert(self, name, value):
+        assert name not in self
+        self[name] = value
+
+    def update(self, name, value):
+        assert name in self
+        self[name] = value
+
+    def pop(self):
+        if self.__root is None:
+            raise IndexError("pop from empty heap")
+        else:
+            root = self.__root
+            del self.__nodes[root.name]
+            self.__root = self.__pair(root.child)
+            if self.__root is not None:
+                self.__root.prev = None
+            return (root.value, root.name)
+
+    @staticmethod
+    def __link(a, b):
+        """
+        links two detached trees, returns the new root
+        """
+        if a is None:
+            return b
+        elif b is None:
+            return a
+        if b.key < a.key:
+            a, b = b, a
+        # b becomes the leftmost child of a
+        b.prev = a
+        b.sibling = a.child
+        if a.child is not None:
+            a.child.prev = b
+        a.child = b
+        a.sibling = None
+        a.prev = None
+        return a
+
+    @staticmethod
+    def __cut(node):
+        """
+        detaches node (with its subtree) from its parent and siblings
+        """
+        prev = node.prev
+        if prev.child is node:
+            prev.child = node.sibling
+        else:
+            prev.sibling = node.sibling
+        if node.sibling is not None:
+            node.sibling.prev = prev
+        node.prev = node.sibling = None
+
+    def __pair(self, first):
+        """
+        two-pass pairing of the sibling list starting at first,
+        returns the root of the resulting tree
+        """
+        # first pass: link siblings pairwise, left to right
+        pairs = []
+        while first is not None:
+            a = first
+            b = a.sibling
+            if b is None:
+                first = None
+                a.prev = a.sibling = None
+                pairs.append(a)
+            else:
+                first = b.sibling
+                a.prev = a.sibling = b.prev = b.sibling = None
+                pairs.append(self.__link(a, b))
+
+        # second pass: link the pairs right to left
+        root = None
+        for tree in reversed(pairs):
+            root = self.__link(tree, root)
+        return root
+
+
+if __name__ == "__main__":
+    from random import randint
+
+    for _ in range(20):
+        h = PairingHeap()
+        values = {}
+        for name in range(300):
+            values[name] = randint(-1000, 1000)
+            h.insert(name=name, value=values[name])
+        for _ in range(300):
+            name = randint(0, 299)
+            if name in h:
+                # both decrease- and increase-keys
+                values[name] = randint(-1000, 1000)
+                h.update(name=name, value=values[name])
+            if randint(0, 2) == 0:
+                value, name = h.pop()
+                assert value == min(values.values())
+                del values[name]
+        assert len(h) == len(values)
+        popped = [h.pop()[0] for _ in range(len(values))]
+        assert popped == sorted(values.values())
+
+    h = PairingHeap(key=lambda task: task[1])
+    h["a"], h["b"] = (0, 14), (16, 12)
+    assert h.get_root() == ((16, 12), "b")
+    h["b"] = (16, 20)
+    assert h.get_root() == ((0, 14), "a")
+    assert h["b"] == (16, 20)
+
+    try:
+        PairingHeap().pop()
+        assert False is True
+    except IndexError:
+        pass
+
+    print("all tests successful")
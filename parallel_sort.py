@@ -0,0 +1,139 @@
+"""
+Parallel sorting
+https://www.wikiwand.com/en/Merge_sort#Parallel_merge_sort
+
+The input is split into one slice per worker process, every slice is
+sorted independently, then the sorted runs are k-way merged through a
+heap.Heap (see external_sort.kway_merge).
+
+Numeric array.array inputs (without key) are copied once into a
+multiprocessing.shared_memory block: workers sort their slice in place
+inside the shared buffer, so no data is pickled back and forth.
+Other inputs are pickled to the workers slice by slice, so key must
+be picklable (e.g. a module-level function, not a lambda).
+"""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from os import cpu_count
+
+from external_sort import kway_merge
+from heapsort import heapsort, heapsorted
+
+
+def parallel_sorted(arr, key=None, reverse=False, workers=None):
+    """
+    arguments:
+        arr: list, or array.array to go through shared memory
+        key: picklable function applied to items to compare them
+        reverse: sort in descending order
+        workers: number of worker processes, None uses every core
+
+    returns:
+        new sorted list, or array.array with the same typecode as arr
+    """
+    workers = workers or cpu_count() or 1
+    n = len(arr)
+    bounds = [(n * i // workers, n * (i + 1) // workers) for i in range(workers)]
+
+    if workers == 1 or n < 2 * workers:
+        result = array(arr.typecode, arr) if isinstance(arr, array) else list(arr)
+        heapsort(result, key=key, reverse=reverse)
+        return result
+
+    if isinstance(arr, array) and key is None:
+        return _parallel_sorted_shared(arr, reverse, bounds)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        runs = list(pool.map(
+            _sorted_slice,
+            (arr[lo:hi] for lo, hi in bounds),
+            [key] * workers,
+            [reverse] * workers,
+        ))
+
+    merged = kway_merge(runs, key=key, reverse=reverse)
+    return array(arr.typecode, merged) if isinstance(arr, array) else list(merged)
+
+
+def _sorted_slice(items, key, reverse):
+    return heapsorted(items, key=key, reverse=reverse)
+
+
+def _parallel_sorted_shared(arr, reverse, bounds):
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(arr) * arr.itemsize))
+    try:
+        buffer = shm.buf.cast(arr.typecode)
+        buffer[:len(arr)] = memoryview(arr)
+
+        with ProcessPoolExecutor(max_workers=len(bounds)) as pool:
+            list(pool.map(
+                _sort_shared_slice,
+                [shm.name] * len(bounds),
+                [arr.typecode] * len(bounds),
+                [lo for lo, _ in bounds],
+                [hi for _, hi in bounds],
+                [reverse] * len(bounds),
+            ))
+
+        runs = [buffer[lo:hi] for lo, hi in bounds]
+        result = array(arr.typecode, kway_merge(runs, reverse=reverse))
+
+        for run in runs:
+            run.release()
+        buffer.release()
+        return result
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _sort_shared_slice(name, typecode, lo, hi, reverse):
+    """
+    sorts buffer[lo:hi] in place inside the shared memory block name
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        buffer = shm.buf.cast(typecode)
+        run = buffer[lo:hi]
+        heapsort(run)
+        if reverse:
+            # memoryviews can't reverse(), swap from both ends
+            for i in range((hi - lo) // 2):
+                run[i], run[hi - lo - 1 - i] = run[hi - lo - 1 - i], run[i]
+        run.release()
+        buffer.release()
+    finally:
+        shm.close()
+
+
+def _second(item):
+    return item[1]
+
+
+if __name__ == "__main__":
+    from random import randint, random
+
+    for workers in [1, 2, 3]:
+        arr = [randint(-1000, 1000) for _ in range(randint(0, 2000))]
+        assert parallel_sorted(arr, workers=workers) == sorted(arr)
+        assert parallel_sorted(arr, reverse=True, workers=workers) == sorted(arr, reverse=True)
+
+        numbers = array("d", (random() for _ in range(randint(0, 2000))))
+        result = parallel_sorted(numbers, workers=workers)
+        assert isinstance(result, array) and result.typecode == "d"
+        assert list(result) == sorted(numbers)
+        assert list(parallel_sorted(numbers, reverse=True, workers=workers)) == sorted(numbers, reverse=True)
+
+        ints = array("q", (randint(-2 ** 62, 2 ** 62) for _ in range(1000)))
+        assert list(parallel_sorted(ints, workers=workers)) == sorted(ints)
+
+        tasks = [(i, randint(0, 100)) for i in range(500)]
+        result = parallel_sorted(tasks, key=_second, workers=workers)
+        assert [_second(task) for task in result] == sorted(map(_second, tasks))
+
+    assert parallel_sorted([], workers=4) == []
+    assert list(parallel_sorted(array("i"), workers=4)) == []
+
+    print("all tests successful")
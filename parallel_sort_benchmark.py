@@ -0,0 +1,40 @@
+"""
+Parallel sort scaling benchmark
+
+Times parallel_sort.parallel_sorted with 1 to N worker processes,
+on a list (pickled slices) and on an array.array (shared memory).
+
+usage:
+    python3 parallel_sort_benchmark.py [n] [max_workers]
+"""
+
+from array import array
+from os import cpu_count
+from random import random, seed
+from sys import argv
+from time import perf_counter
+
+from parallel_sort import parallel_sorted
+
+
+if __name__ == "__main__":
+    n = int(argv[1]) if len(argv) > 1 else 20_000
+    max_workers = int(argv[2]) if len(argv) > 2 else cpu_count() or 1
+
+    seed(0)
+    inputs = [
+        ("list", [random() for _ in range(n)]),
+        ("array('d')", array("d", (random() for _ in range(n)))),
+    ]
+
+    print(f"n = {n}")
+    for input_name, arr in inputs:
+        expected = sorted(arr)
+        single = None
+        for workers in range(1, max_workers + 1):
+            start = perf_counter()
+            result = parallel_sorted(arr, workers=workers)
+            elapsed = perf_counter() - start
+            assert list(result) == expected
+            single = single or elapsed
+            print(f"{input_name:>12}, {workers:>2} workers: {elapsed:.4f}s ({single / elapsed:.2f}x)")
@@ -0,0 +1,273 @@
+"""
+Shortest paths query cache
+https://www.wikiwand.com/en/Cache_replacement_policies#Least_recently_used_(LRU)
+
+Single-source results are cached by (graph version, source) and evicted
+least recently used first, within a number of entries and a byte budget.
+Every edge change bumps the version of a VersionedGraph, so a result
+computed on an older graph can never be served again: the first lookup
+after a change drops the whole cache.
+"""
+
+from collections import OrderedDict
+from sys import getsizeof
+from types import MappingProxyType
+
+from csr_graph import Graph
+from dijkstra_distances import dijkstra
+from dynamic_sssp import DynamicSSSP
+
+
+class VersionedGraph:
+    """
+    directed graph as a dict of dicts, g[a][b] is the cost of the edge a -> b,
+    read-only except through methods that bump g.version
+    """
+
+    def __init__(self, g=None):
+        """
+        arguments:
+            g: optional dict of dicts to copy, as in dijkstra_paths
+        """
+        self.__g = {}
+        self.version = 0
+        self.__csr = None
+        for a, edges in (g or {}).items():
+            self.add_node(a)
+            for b, cost in edges.items():
+                self.set_edge(a, b, cost)
+
+    def __len__(self):
+        return len(self.__g)
+
+    def __iter__(self):
+        return iter(self.__g)
+
+    def __contains__(self, a):
+        return a in self.__g
+
+    def __getitem__(self, a):
+        return MappingProxyType(self.__g[a])
+
+    def keys(self):
+        return self.__g.keys()
+
+    def add_node(self, a):
+        if a not in self.__g:
+            self.__g[a] = {}
+            self.version += 1
+
+    def set_edge(self, a, b, cost):
+        """
+        adds the edge a -> b, or changes its cost
+        """
+        self.add_node(a)
+        self.add_node(b)
+        self.__g[a][b] = cost
+        self.version += 1
+
+    def remove_edge(self, a, b):
+        del self.__g[a][b]
+        self.version += 1
+
+    def to_csr(self):
+        """
+        returns:
+            the graph as a csr_graph.Graph with node names,
+            rebuilt only after a change
+        """
+        if self.__csr is None or self.__csr[0] != self.version:
+            self.__csr = (self.version, Graph.from_dict(self.__g))
+        return self.__csr[1]
+
+
+def distances(g, s):
+    """
+    returns:
+        dict, distances[z] is the length of the shortest path from s to z,
+        for the nodes z reachable from s (dijkstra_distances.dijkstra)
+    """
+    csr = g.to_csr()
+    d = dijkstra(csr, csr.index[s])
+    return {csr.names[z]: d[z] for z in range(len(csr)) if d[z] is not None}
+
+
+def paths(g, s):
+    """
+    returns:
+        d: dict, as returned by distances()
+        p: dict, p[z] is a shortest path from s to z without s,
+            for the nodes z reachable from s (as in dijkstra_paths.dijkstra)
+    """
+    csr = g.to_csr()
+    tree = DynamicSSSP(csr, csr.index[s])
+    d, p = {}, {}
+    for z, dist in enumerate(tree.distances()):
+        if dist is not None:
+            d[csr.names[z]] = dist
+            p[csr.names[z]] = [csr.names[u] for u in tree.path(z)[1:]]
+    return d, p
+
+
+class QueryCache:
+    """
+    LRU cache of single-source results over a VersionedGraph;
+    cached results are shared between callers, don't modify them
+    """
+
+    def __init__(self, g, solver=distances, max_entries=1024, max_bytes=None):
+        """
+        arguments:
+            g: VersionedGraph
+            solver: function (g, source) -> result, e.g. distances or paths
+            max_entries: maximum number of cached results
+            max_bytes: maximum estimated size of the cached results, None for no limit
+        """
+        self.g = g
+        self.solver = solver
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # (version, source) -> (result, size), least recently used first
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.version = g.version
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, source):
+        """
+        returns:
+            solver(g, source), computed only if not cached for the current graph
+        """
+        if self.g.version != self.version:
+            self.stats["invalidations"] += len(self.entries)
+            self.entries.clear()
+            self.bytes = 0
+            self.version = self.g.version
+
+        key = (self.version, source)
+        if key in self.entries:
+            self.stats["hits"] += 1
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+        self.stats["misses"] += 1
+        result = self.solver(self.g, source)
+        size = sizeof(result)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # it would evict everything and still not fit
+            return result
+
+        self.entries[key] = (result, size)
+        self.bytes += size
+        while len(self.entries) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.stats["evictions"] += 1
+        return result
+
+
+def sizeof(obj):
+    """
+    returns:
+        estimated size in bytes of obj and of the containers and items it holds
+    """
+    size = getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(sizeof(k) + sizeof(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(sizeof(item) for item in obj)
+    # getsizeof already counts the buffer of an array.array
+    return size
+
+
+if __name__ == "__main__":
+    from random import randint
+
+    g = VersionedGraph({
+        "s": {"v1": 1, "v3": 10},
+        "v1": {"v4": 100, "v2": 100},
+        "v2": {"t": 1},
+        "v3": {"v2": 10, "v4": 10},
+        "v4": {"t": 1},
+        "t": {}
+    })
+    cache = QueryCache(g)
+    assert cache.get("s")["t"] == 21
+    assert cache.get("s") is cache.get("s")
+    assert cache.stats == {"hits": 2, "misses": 1, "evictions": 0, "invalidations": 0}
+
+    version = g.version
+    g.set_edge("s", "t", 5)
+    assert g.version > version
+    assert cache.get("s")["t"] == 5
+    assert cache.stats["misses"] == 2 and cache.stats["invalidations"] == 1
+    g.remove_edge("s", "t")
+    assert cache.get("s")["t"] == 21
+    assert "s" not in cache.get("t")
+
+    try:
+        g["s"]["t"] = 0
+        assert False is True
+    except TypeError:
+        pass
+
+    paths_cache = QueryCache(g, solver=paths)
+    d, p = paths_cache.get("s")
+    assert d["t"] == 21 and p["t"] in (["v3", "v2", "t"], ["v3", "v4", "t"])
+    assert p["s"] == [] and d == distances(g, "s")
+
+    # unreachable nodes are left out
+    partial = VersionedGraph({"a": {"b": 1}, "b": {}, "c": {}})
+    assert QueryCache(partial, solver=paths).get("a") == (
+        {"a": 0, "b": 1}, {"a": [], "b": ["b"]}
+    )
+    assert paths(partial, "c") == ({"c": 0}, {"c": []})
+
+    # LRU eviction by entries
+    cache = QueryCache(g, max_entries=2)
+    for source in ["s", "v1", "s", "v2", "v1"]:
+        cache.get(source)
+    assert list(source for _, source in cache.entries) == ["v2", "v1"]
+    assert cache.stats == {"hits": 1, "misses": 4, "evictions": 2, "invalidations": 0}
+
+    # LRU eviction by bytes
+    size = sizeof(distances(g, "s"))
+    cache = QueryCache(g, max_bytes=2 * size)
+    cache.get("s")
+    cache.get("v3")
+    assert cache.bytes <= 2 * size and len(cache) <= 2
+    cache = QueryCache(g, max_bytes=size - 1)
+    assert cache.get("s")["t"] == 21 and len(cache) == 0 and cache.bytes == 0
+
+    # random graphs, random edits: never a stale answer
+    for solver in [distances, paths]:
+        for _ in range(50):
+            n = randint(1, 20)
+            g = VersionedGraph({u: {} for u in range(n)})
+            cache = QueryCache(
+                g, solver=solver, max_entries=randint(1, 5), max_bytes=randint(500, 5000)
+            )
+            for _ in range(100):
+                a, b = randint(0, n - 1), randint(0, n - 1)
+                if randint(0, 2) == 0:
+                    g.set_edge(a, b, randint(0, 20))
+                elif randint(0, 2) == 0 and b in g[a]:
+                    g.remove_edge(a, b)
+                result = cache.get(a)
+                if solver is distances:
+                    assert result == distances(g, a)
+                else:
+                    d, p = result
+                    assert d == distances(g, a) and d.keys() == p.keys()
+                    for z, path in p.items():
+                        nodes = [a] + path
+                        assert sum(g[u][v] for u, v in zip(nodes, nodes[1:])) == d[z]
+                assert len(cache) <= cache.max_entries and cache.bytes <= cache.max_bytes
+
+    print("all tests successful")
@@ -0,0 +1,163 @@
+"""
+Radix heap
+https://www.wikiwand.com/en/Radix_heap
+
+A monotone priority queue for non-negative integer keys:
+keys are never smaller than the last popped one, as in Dijkstra
+with integer edge lengths. Items sit in buckets by the highest bit
+in which their key differs from the last popped key, so each item
+moves to a lower bucket at most O(log C) times and no key comparisons
+happen outside the bucket being emptied.
+"""
+
+from heap import Heap
+
+
+class RadixHeap:
+    """
+    name-value monotone min-heap for non-negative integer keys,
+    same interface as heap.Heap (see heap.PriorityQueue)
+    """
+
+    def __init__(self, max_size=None, key=lambda item: item):
+        """
+        arguments:
+            max_size: maximum number of items the heap can hold,
+                None (default) lets the heap grow as needed
+            key: function applied to values, must return integers
+                not smaller than the key of the last popped item
+        """
+        self.__max_size = max_size
+
+        # key of the last popped item, a lower bound on all keys
+        self.__last = 0
+
+        # self.__buckets[b][name] will be the (key, value) pair of an item
+        # whose key differs from self.__last first at bit b - 1,
+        # self.__buckets[0] holds the items whose key equals self.__last
+        self.__buckets = [{}]
+
+        # self.__bucket[name] will be the bucket index of the item with that name
+        self.__bucket = {}
+
+        self.__key = key
+
+    def __contains__(self, name):
+        return name in self.__bucket
+
+    def __getitem__(self, name):
+        if len(self.__bucket) == 0:
+            raise IndexError("empty heap")
+        elif name not in self:
+            raise KeyError(name)
+        else:
+            _, value = self.__buckets[self.__bucket[name]][name]
+            return value
+
+    def __len__(self):
+        return len(self.__bucket)
+
+    def __str__(self):
+        return f"{[(v, name) for b in self.__buckets for name, (_, v) in b.items()]}"
+
+    def __place(self, name, k, value):
+        b = (k ^ self.__last).bit_length()
+        while b >= len(self.__buckets):
+            self.__buckets.append({})
+        self.__buckets[b][name] = (k, value)
+        self.__bucket[name] = b
+
+    def __setitem__(self, name, value):
+        k = self.__key(value)
+        assert isinstance(k, int) and k >= self.__last, "non-monotone key"
+        if name not in self.__bucket:
+            if len(self.__bucket) == self.__max_size:
+                raise Heap.FullHeapException
+        else:
+            del self.__buckets[self.__bucket[name]][name]
+        self.__place(name, k, value)
+
+    def insert(self, name, value):
+        assert name not in self
+        self[name] = value
+
+    def update(self, name, value):
+        assert name in self
+        self[name] = value
+
+    def __first_bucket(self):
+        for bucket in self.__buckets:
+            if bucket:
+                return bucket
+
+    def get_root(self):
+        if len(self.__bucket) == 0:
+            raise IndexError("pop from empty heap")
+        else:
+            bucket = self.__first_bucket()
+            name = min(bucket, key=lambda name: bucket[name][0])
+            return (bucket[name][1], name)
+
+    def pop(self):
+        if len(self.__bucket) == 0:
+            raise IndexError("pop from empty heap")
+
+        if not self.__buckets[0]:
+            # move the smallest key to self.__last and
+            # redistribute its bucket, every item lands lower
+            bucket = self.__first_bucket()
+            self.__last = min(k for k, _ in bucket.values())
+            items = list(bucket.items())
+            bucket.clear()
+            for name, (k, value) in items:
+                self.__place(name, k, value)
+
+        name, (_, value) = self.__buckets[0].popitem()
+        del self.__bucket[name]
+        return (value, name)
+
+
+if __name__ == "__main__":
+    from random import randint
+
+    for _ in range(20):
+        h = RadixHeap()
+        values = {}
+        last = 0
+        for name in range(300):
+            values[name] = randint(0, 1000)
+            h.insert(name=name, value=values[name])
+        for _ in range(600):
+            name = randint(0, 299)
+            if name in h and randint(0, 1):
+                # decrease-key, never below the last popped key
+                values[name] = randint(last, values[name])
+                h.update(name=name, value=values[name])
+            elif name not in h and randint(0, 1):
+                values[name] = randint(last, last + 1000)
+                h.insert(name=name, value=values[name])
+            elif len(h) > 0:
+                assert h.get_root()[0] == min(values.values())
+                last, name = h.pop()
+                assert last == values.pop(name)
+        popped = [h.pop()[0] for _ in range(len(values))]
+        assert popped == sorted(values.values())
+
+    h = RadixHeap(key=lambda task: task[1])
+    h["a"], h["b"] = (0, 14), (16, 12)
+    assert h.pop() == ((16, 12), "b")
+    try:
+        h["c"] = (0, 3)
+        monotone = True
+    except AssertionError:
+        monotone = False
+    assert not monotone
+    assert h["a"] == (0, 14)
+
+    try:
+        RadixHeap().pop()
+        assert False is True
+    except IndexError:
+        pass
+
+    print("all tests successful")
@@ -0,0 +1,325 @@
+"""
+Search instrumentation
+
+Opt-in counters and phase timings for shortest path searches:
+nodes settled, edges relaxed, heap inserts, decrease-keys, pops and
+maximum heap size. A search collects them when it gets a SearchStats
+through its stats= argument, or when it runs inside collecting().
+When neither is given the queue is not wrapped and no phase is timed:
+disabled instrumentation costs a lookup per call, and the two local
+counters every search loop keeps anyway.
+
+Every search follows the same steps:
+    stats, queue = begin(stats, queue)
+    with phase(stats, "search"):
+        ... settled, relaxed ...
+    count(stats, settled, relaxed)
+"""
+
+import json
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from time import perf_counter
+
+
+_active = ContextVar("search_stats", default=None)
+
+
+class SearchStats:
+    """
+    counters and phase timings, summed over every instrumented search
+    (max_heap_size is the maximum over them)
+    """
+
+    COUNTERS = [
+        "queries",
+        "nodes_settled",
+        "edges_relaxed",
+        "heap_inserts",
+        "decrease_keys",
+        "heap_pops",
+        "max_heap_size",
+    ]
+
+    def __init__(self):
+        self.counters = {name: 0 for name in SearchStats.COUNTERS}
+        # seconds spent in every phase
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        """
+        adds the time spent in the with block to the phase name
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + perf_counter() - start
+
+    def queue(self, queue):
+        """
+        arguments:
+            queue: priority queue class (see heap.PriorityQueue)
+
+        returns:
+            constructor of instances of queue that count their operations here
+        """
+        return lambda *args, **kwargs: InstrumentedQueue(queue(*args, **kwargs), self)
+
+    def as_dict(self):
+        return {**self.counters, "phases": dict(self.phases)}
+
+    def to_json(self):
+        return json.dumps(self.as_dict())
+
+
+class InstrumentedQueue:
+    """
+    priority queue wrapper counting the operations on it,
+    same interface as heap.Heap (see heap.PriorityQueue)
+    """
+
+    def __init__(self, queue, stats):
+        """
+        arguments:
+            queue: priority queue instance to wrap
+            stats: SearchStats to count into
+        """
+        self.__queue = queue
+        self.__counters = stats.counters
+
+    def __contains__(self, name):
+        return name in self.__queue
+
+    def __getitem__(self, name):
+        return self.__queue[name]
+
+    def __len__(self):
+        return len(self.__queue)
+
+    def __str__(self):
+        return str(self.__queue)
+
+    def __setitem__(self, name, value):
+        counters = self.__counters
+        if name in self.__queue:
+            counters["decrease_keys"] += 1
+        else:
+            counters["heap_inserts"] += 1
+        self.__queue[name] = value
+        if len(self.__queue) > counters["max_heap_size"]:
+            counters["max_heap_size"] = len(self.__queue)
+
+    def insert(self, name, value):
+        assert name not in self
+        self[name] = value
+
+    def update(self, name, value):
+        assert name in self
+        self[name] = value
+
+    def get_root(self):
+        return self.__queue.get_root()
+
+    def pop(self):
+        self.__counters["heap_pops"] += 1
+        return self.__queue.pop()
+
+
+def active():
+    """
+    returns:
+        the SearchStats of the innermost collecting() block, None outside of them
+    """
+    return _active.get()
+
+
+def resolve(stats):
+    """
+    returns:
+        stats, or active() if stats is None
+    """
+    return _active.get() if stats is None else stats
+
+
+def begin(stats, queue):
+    """
+    counts a new query
+
+    arguments:
+        stats: the stats= argument of the search
+        queue: priority queue class of the search
+
+    returns:
+        stats: resolve(stats)
+        queue: queue, instrumented if stats is not None
+    """
+    stats = resolve(stats)
+    if stats is None:
+        return None, queue
+    stats.counters["queries"] += 1
+    return stats, stats.queue(queue)
+
+
+def phase(stats, name):
+    """
+    returns:
+        stats.phase(name), a context manager doing nothing if stats is None
+    """
+    return nullcontext() if stats is None else stats.phase(name)
+
+
+def count(stats, settled, relaxed):
+    """
+    adds the nodes settled and the edges relaxed by a search to stats, if any
+    """
+    if stats is not None:
+        stats.counters["nodes_settled"] += settled
+        stats.counters["edges_relaxed"] += relaxed
+
+
+@contextmanager
+def collecting(stats=None):
+    """
+    instruments every search run inside the with block that
+    doesn't get its own stats= argument
+
+    arguments:
+        stats: SearchStats to count into, None creates a new one
+
+    yields:
+        stats
+    """
+    stats = SearchStats() if stats is None else stats
+    token = _active.set(stats)
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+if __name__ == "__main__":
+    from random import randint
+
+    from csr_graph import Graph
+    from dijkstra_benchmark import random_edges
+    from dijkstra_distances import AdjEdge, dijkstra
+    from heap import Heap
+    from pairing_heap import PairingHeap
+
+    # dijkstra_distances looks up the stats of the imported module,
+    # not of this __main__ copy
+    from search_stats import active, collecting
+
+    stats = SearchStats()
+    h = stats.queue(Heap)()
+    for name in range(10):
+        h.insert(name=name, value=randint(0, 100))
+    h.update(name=3, value=-1)
+    h[20] = 5
+    assert h.get_root() == (-1, 3) and 3 in h and h[3] == -1
+    assert [h.pop()[1] for _ in range(4)][0] == 3
+    assert len(h) == 7
+    assert stats.counters["heap_inserts"] == 11 and stats.counters["decrease_keys"] == 1
+    assert stats.counters["heap_pops"] == 4 and stats.counters["max_heap_size"] == 11
+
+    for _ in range(50):
+        n = randint(1, 50)
+        edges = random_edges(n, randint(0, 200))
+        adj = [None for _ in range(n)]
+        for u, v, w in edges:
+            adj[u] = AdjEdge((w, v), adj[u])
+        g = Graph.from_edges(edges, n=n)
+        expected = dijkstra(g, 0)
+
+        settled = [u for u in range(n) if expected[u] is not None]
+        # edges out of settled nodes, but self-loops and edges back into s
+        # lead to nodes already settled and are never relaxed
+        scanned = sum(
+            1 for u in settled for _, v in g.neighbours(u) if v != u and v != 0
+        )
+
+        for graph in [g, adj]:
+            for queue in [Heap, PairingHeap]:
+                stats = SearchStats()
+                assert dijkstra(graph, 0, queue=queue, stats=stats) == expected
+                counters = stats.counters
+                assert counters["queries"] == 1
+                assert counters["nodes_settled"] == counters["heap_pops"] == len(settled)
+                assert counters["heap_inserts"] == len(settled)
+                # every insert but the source's and every decrease-key
+                # come from a relaxed edge
+                assert counters["heap_inserts"] - 1 + counters["decrease_keys"] \
+                    <= counters["edges_relaxed"] <= scanned
+                assert 1 <= counters["max_heap_size"] <= n
+                assert stats.phases["search"] >= 0
+
+        with collecting() as stats:
+            dijkstra(g, 0)
+            dijkstra(adj, 0)
+            with collecting() as inner:
+                dijkstra(g, 0)
+            assert active() is stats
+        assert active() is None
+        assert stats.counters["queries"] == 2 and inner.counters["queries"] == 1
+        assert stats.counters["nodes_settled"] == 2 * len(settled)
+
+    # 0 -> 2 is relaxed, then improved through 1; 1 -> 0, 2 -> 0 and 2 -> 2
+    # lead to settled nodes
+    edges = [(0, 1, 1), (0, 2, 5), (1, 2, 1), (1, 0, 3), (2, 0, 1), (2, 2, 0)]
+    adj = [None for _ in range(3)]
+    for u, v, w in reversed(edges):
+        adj[u] = AdjEdge((w, v), adj[u])
+    for graph in [Graph.from_edges(edges), adj]:
+        stats = SearchStats()
+        assert dijkstra(graph, 0, stats=stats) == [0, 1, 2]
+        assert stats.counters["nodes_settled"] == stats.counters["heap_pops"] == 3
+        assert stats.counters["edges_relaxed"] == 3
+        assert stats.counters["heap_inserts"] == 3 and stats.counters["decrease_keys"] == 1
+        assert set(stats.phases) == {"search"}
+
+    exported = json.loads(stats.to_json())
+    assert exported == stats.as_dict()
+    assert set(exported) == set(SearchStats.COUNTERS) | {"phases"}
+
+    # every search counts into stats= or collecting(), by phases
+    from alt import ALT, a_star
+    from contraction_hierarchy import ContractionHierarchy
+    from dijkstra_distances import dial_dijkstra, multi_source_dijkstra
+    from shortest_path import bidirectional_shortest_path, shortest_path
+
+    g = Graph.from_edges([(u, u + 1, 1) for u in range(9)] + [(0, 5, 10)])
+    alt = ALT(g, k=2)
+    ch = ContractionHierarchy(g)
+    ch.contract()
+    searches = [
+        (lambda stats: dial_dijkstra(g, 0, stats=stats), {"setup", "search"}),
+        (lambda stats: multi_source_dijkstra(g, [0, 4], stats=stats), {"search"}),
+        (lambda stats: shortest_path(g, 0, 9, stats=stats), {"search", "path"}),
+        (
+            lambda stats: bidirectional_shortest_path(g, 0, 9, stats=stats),
+            {"setup", "search", "path"},
+        ),
+        (lambda stats: a_star(g, 0, 9, lambda v: 0, stats=stats), {"search", "path"}),
+        (lambda stats: alt.query(0, 9, stats=stats), {"setup", "search", "path"}),
+        (lambda stats: ch.query(0, 9, stats=stats), {"search", "path"}),
+    ]
+    for search, phases in searches:
+        stats = SearchStats()
+        expected = search(None)
+        assert search(stats) == expected
+        with collecting() as collected:
+            assert search(None) == expected
+        for counters in [stats.counters, collected.counters]:
+            assert counters["queries"] == 1
+            assert 0 < counters["nodes_settled"] == counters["heap_pops"]
+            assert counters["edges_relaxed"] > 0
+        assert set(stats.phases) == set(collected.phases) == phases
+
+    # no path to rebuild when t is unreachable
+    stats = SearchStats()
+    assert shortest_path(g, 9, 0, stats=stats) == (None, None)
+    assert stats.counters["nodes_settled"] == 1 and set(stats.phases) == {"search"}
+
+    print("all tests successful")
@@ -0,0 +1,245 @@
+"""
+Point-to-point shortest paths
+https://www.wikiwand.com/en/Dijkstra%27s_algorithm#Practical_optimizations_and_infinite_graphs
+
+Bidirectional search
+https://www.wikiwand.com/en/Bidirectional_search
+
+When only the distance from s to t is needed, Dijkstra can stop as soon as
+t is settled. Bidirectional Dijkstra runs a forward search from s and a
+backward search from t on the reverse graph and stops once the two
+frontiers prove that no shorter path can exist: on large graphs the two
+small balls around s and t settle far fewer nodes than one big ball.
+"""
+
+from csr_graph import Graph
+from dijkstra_distances import neighbours
+from heap import Heap
+import search_stats
+
+
+def shortest_path(g, s, t, queue=Heap, stats=None):
+    """
+    Dijkstra from s that stops as soon as t is settled
+
+    arguments:
+        g: csr_graph.Graph (node labels are used if g.names is set),
+            or adjacency list of dijkstra_distances.AdjEdge chains,
+            searched as they are: nothing is converted per query
+        s: starting node
+        t: destination node
+        queue: priority queue class (see heap.PriorityQueue)
+        stats: search_stats.SearchStats to count the search into,
+            None uses the one of search_stats.collecting(), if any
+
+    returns:
+        d: length of the shortest path from s to t, None if unreachable
+        p: list of nodes of a shortest path, from s to t included
+    """
+    stats, queue = search_stats.begin(stats, queue)
+    s, t = node_numbers(g, s, t)
+    out = neighbours(g)
+
+    with search_stats.phase(stats, "search"):
+        heap = queue()
+        heap.insert(name=s, value=0)
+        parent = {s: None}
+        settled = set()
+        relaxed = 0
+        d = None
+
+        while len(heap) > 0:
+            dist_u, u = heap.pop()
+            settled.add(u)
+            if u == t:
+                d = dist_u
+                break
+
+            for length, v in out(u):
+                if v not in settled:
+                    relaxed += 1
+                    dist = dist_u + length
+                    if v not in heap or dist < heap[v]:
+                        heap[v] = dist
+                        parent[v] = u
+
+    search_stats.count(stats, len(settled), relaxed)
+    if d is None:
+        return None, None
+    with search_stats.phase(stats, "path"):
+        return d, to_labels(g, path_to(parent, t)[::-1])
+
+
+def bidirectional_shortest_path(g, s, t, reverse=None, queue=Heap, stats=None):
+    """
+    bidirectional Dijkstra, expanding every step the side with the
+    smaller frontier; it stops when the two smallest tentative distances
+    add up to at least the best s -> t path met so far
+
+    arguments:
+        g, s, t, queue, stats: see shortest_path()
+        reverse: reverse_graph(g); None builds it in O(n + m) on every
+            call, so build it once and pass it when running many queries
+
+    returns:
+        d, p: see shortest_path()
+    """
+    stats, queue = search_stats.begin(stats, queue)
+    s, t = node_numbers(g, s, t)
+    if s == t:
+        return 0, to_labels(g, [s])
+    if reverse is None:
+        with search_stats.phase(stats, "setup"):
+            reverse = reverse_graph(g)
+
+    FORWARD, BACKWARD = 0, 1
+    graphs = [neighbours(g), neighbours(reverse)]
+    distances = [{s: 0}, {t: 0}]
+    parents = [{s: None}, {t: None}]
+    settled = [set(), set()]
+    heaps = [queue(), queue()]
+    heaps[FORWARD].insert(name=s, value=0)
+    heaps[BACKWARD].insert(name=t, value=0)
+
+    best, meeting_node = float("+inf"), None
+    relaxed = 0
+
+    with search_stats.phase(stats, "search"):
+        while len(heaps[FORWARD]) > 0 and len(heaps[BACKWARD]) > 0:
+            if heaps[FORWARD].get_root()[0] + heaps[BACKWARD].get_root()[0] >= best:
+                break
+
+            side = FORWARD if len(heaps[FORWARD]) <= len(heaps[BACKWARD]) else BACKWARD
+            other = 1 - side
+            heap, dist, parent = heaps[side], distances[side], parents[side]
+
+            dist_u, u = heap.pop()
+            settled[side].add(u)
+
+            for length, v in graphs[side](u):
+                if v in settled[side]:
+                    continue
+                relaxed += 1
+                candidate = dist_u + length
+                if v not in dist or candidate < dist[v]:
+                    dist[v] = candidate
+                    parent[v] = u
+                    heap[v] = candidate
+                    if v in distances[other] and candidate + distances[other][v] < best:
+                        best, meeting_node = candidate + distances[other][v], v
+
+    search_stats.count(stats, len(settled[FORWARD]) + len(settled[BACKWARD]), relaxed)
+    if meeting_node is None:
+        return None, None
+
+    with search_stats.phase(stats, "path"):
+        path = path_to(parents[FORWARD], meeting_node)[::-1]
+        path += path_to(parents[BACKWARD], meeting_node)[1:]
+        return best, to_labels(g, path)
+
+
+def node_numbers(g, s, t):
+    """
+    returns:
+        s and t as node numbers of g, if it is a csr_graph.Graph with names
+    """
+    if isinstance(g, Graph) and g.index is not None:
+        s, t = g.index[s], g.index[t]
+    return s, t
+
+
+def reverse_graph(g):
+    """
+    returns:
+        csr_graph.Graph of the edges of g, reversed, built in O(n + m)
+    """
+    if not isinstance(g, Graph):
+        g = Graph.from_adj_edges(g)
+    return g.reverse()
+
+
+def path_to(parent, u):
+    """
+    returns:
+        nodes from u up to the root of the parent tree
+    """
+    path = []
+    while u is not None:
+        path.append(u)
+        u = parent[u]
+    return path
+
+
+def to_labels(g, path):
+    """
+    returns:
+        path with node numbers turned into the labels of g, if it has names
+    """
+    names = getattr(g, "names", None)
+    return path if names is None else [names[u] for u in path]
+
+
+def path_length(g, path):
+    """
+    returns:
+        length of path, a list of node numbers of the csr_graph.Graph g,
+        through the shortest of any parallel edges
+    """
+    length = 0
+    for u, v in zip(path, path[1:]):
+        length += min(w for w, x in g.neighbours(u) if x == v)
+    return length
+
+
+if __name__ == "__main__":
+    from random import randint
+
+    from dijkstra_benchmark import random_edges
+    from dijkstra_distances import AdjEdge, dijkstra
+
+    for _ in range(200):
+        n = randint(1, 40)
+        edges = random_edges(n, randint(0, 4 * n), integer=n % 2 == 1)
+        g = Graph.from_edges(edges, n=n)
+        reverse = g.reverse()
+        adj = [None for _ in range(n)]
+        for u, v, w in edges:
+            adj[u] = AdjEdge((w, v), adj[u])
+        s = randint(0, n - 1)
+        distances = dijkstra(g, s)
+
+        for t in range(n):
+            for d, p in [
+                shortest_path(g, s, t),
+                shortest_path(adj, s, t),
+                bidirectional_shortest_path(g, s, t, reverse=reverse),
+                bidirectional_shortest_path(adj, s, t, reverse=reverse),
+            ]:
+                if distances[t] is None:
+                    assert d is None and p is None
+                else:
+                    assert abs(d - distances[t]) < 1e-9
+                    assert p[0] == s and p[-1] == t
+                    assert abs(path_length(g, p) - d) < 1e-9
+
+    g = Graph.from_dict({
+        "s": {"v1": 1, "v3": 10},
+        "v1": {"v4": 100, "v2": 100},
+        "v2": {"t": 1},
+        "v3": {"v2": 10, "v4": 10},
+        "v4": {"t": 1},
+        "t": {}
+    })
+    for d, p in [shortest_path(g, "s", "t"), bidirectional_shortest_path(g, "s", "t")]:
+        assert d == 21 and p in (["s", "v3", "v2", "t"], ["s", "v3", "v4", "t"])
+    assert bidirectional_shortest_path(g, "t", "s") == (None, None)
+    assert bidirectional_shortest_path(g, "v2", "v2") == (0, ["v2"])
+
+    adj = [AdjEdge((1, 1), AdjEdge((5, 2), None)), AdjEdge((1, 2), None), None]
+    assert shortest_path(adj, 0, 2) == (2, [0, 1, 2])
+    assert bidirectional_shortest_path(adj, 0, 2) == (2, [0, 1, 2])
+    reverse = reverse_graph(adj)
+    assert bidirectional_shortest_path(adj, 2, 0, reverse=reverse) == (None, None)
+    assert bidirectional_shortest_path(adj, 1, 2, reverse=reverse) == (1, [1, 2])
+
+    print("all tests successful")
@@ -0,0 +1,139 @@
+"""
+Eytzinger layout (BFS order) of a sorted array
+https://algorithmica.org/en/eytzinger
+
+A sorted array is stored in the order of a breadth-first visit of the
+implicit binary search tree over it: the node at index k has its children
+at 2k and 2k + 1. Every search then walks forward through the array,
+the first levels are shared by all searches and stay in cache, and the
+search loop has no data-dependent branch, only index arithmetic.
+"""
+
+from array import array
+
+
+class StaticSortedIndex:
+    """
+    read-only search index over a sorted sequence of keys,
+    answering as binary_search.bisect_left/bisect_right would
+    """
+
+    def __init__(self, sorted_keys, typecode=None):
+        """
+        arguments:
+            sorted_keys: sorted sequence of keys
+            typecode: array typecode to store the keys compactly,
+                None picks "q" for integers that fit in 64 bits and "d" for floats,
+                other keys are stored in lists
+        """
+        n = len(sorted_keys)
+        if typecode is None:
+            if all(type(k) is int and -2 ** 63 <= k < 2 ** 63 for k in sorted_keys):
+                typecode = "q"
+            elif all(type(k) is float for k in sorted_keys):
+                typecode = "d"
+
+        def column(items):
+            if typecode is None:
+                return list(items)
+            return array(typecode, items)
+
+        self.__n = n
+        self.__sorted = column(sorted_keys)
+
+        # self.__tree[k] is the key at node k of the implicit tree (1-indexed),
+        # self.__rank[k] its index in the sorted order
+        tree = [sorted_keys[0] if n else 0 for _ in range(n + 1)]
+        rank = array("q", bytes(8 * (n + 1)))
+        i = 0
+        # iterative in-order visit of the implicit tree
+        stack, k = [], 1
+        while stack or k <= n:
+            while k <= n:
+                stack.append(k)
+                k = 2 * k
+            k = stack.pop()
+            tree[k] = sorted_keys[i]
+            rank[k] = i
+            i += 1
+            k = 2 * k + 1
+        assert i == n
+
+        self.__tree = column(tree)
+        self.__rank = rank
+
+    def __len__(self):
+        return self.__n
+
+    def bisect_left(self, value):
+        """
+        returns:
+            index of the first key not smaller than value (n if none)
+        """
+        tree, n = self.__tree, self.__n
+        k = 1
+        while k <= n:
+            k = 2 * k + (tree[k] < value)
+        # undo the final right turns, and the last left turn,
+        # to land on the node where the search last went left
+        k >>= (~k & (k + 1)).bit_length()
+        return self.__rank[k] if k else n
+
+    def bisect_right(self, value):
+        """
+        returns:
+            index of the first key bigger than value (n if none)
+        """
+        tree, n = self.__tree, self.__n
+        k = 1
+        while k <= n:
+            k = 2 * k + (not value < tree[k])
+        k >>= (~k & (k + 1)).bit_length()
+        return self.__rank[k] if k else n
+
+    def __contains__(self, value):
+        i = self.bisect_left(value)
+        return i < self.__n and not value < self.__sorted[i]
+
+    def range(self, lo, hi):
+        """
+        returns:
+            keys k with lo <= k < hi, in sorted order
+        """
+        return self.__sorted[self.bisect_left(lo):self.bisect_left(hi)]
+
+
+if __name__ == "__main__":
+    from bisect import bisect_left, bisect_right
+    from random import randint, random
+
+    for _ in range(200):
+        keys = sorted(randint(-50, 50) for _ in range(randint(0, 100)))
+        index = StaticSortedIndex(keys)
+        assert len(index) == len(keys)
+        for value in range(-55, 56):
+            assert index.bisect_left(value) == bisect_left(keys, value)
+            assert index.bisect_right(value) == bisect_right(keys, value)
+            assert (value in index) == (value in keys)
+        lo = randint(-60, 60)
+        hi = randint(lo, 60)
+        assert list(index.range(lo, hi)) == [k for k in keys if lo <= k < hi]
+
+    keys = sorted(random() for _ in range(1000))
+    index = StaticSortedIndex(keys)
+    for value in [random() for _ in range(100)] + keys[::10]:
+        assert index.bisect_right(value) == bisect_right(keys, value)
+
+    keys = [-2 ** 80, -1, 1, 2 ** 63, 2 ** 70]
+    index = StaticSortedIndex(keys)
+    for value in keys + [0, 2 ** 64, -2 ** 90]:
+        assert index.bisect_left(value) == bisect_left(keys, value)
+        assert index.bisect_right(value) == bisect_right(keys, value)
+    assert index.range(0, 2 ** 70) == [1, 2 ** 63]
+
+    words = sorted(["delta", "alpha", "charlie", "bravo", "echo"])
+    index = StaticSortedIndex(words)
+    assert "charlie" in index and "foxtrot" not in index
+    assert index.range("b", "d") == ["bravo", "charlie"]
+
+    print("all tests successful")
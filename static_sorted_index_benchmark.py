@@ -0,0 +1,52 @@
+"""
+Static sorted index benchmark
+
+Times lookups with binary_search.bisect_right, with the Eytzinger
+StaticSortedIndex and with the standard bisect module, for growing
+array sizes, to show where the cache-friendly layout overtakes
+plain binary search.
+
+usage:
+    python3 static_sorted_index_benchmark.py [max_n] [queries]
+"""
+
+from bisect import bisect_right as py_bisect_right
+from random import randint, seed
+from sys import argv
+from time import perf_counter
+
+from binary_search import bisect_right
+from static_sorted_index import StaticSortedIndex
+
+
+if __name__ == "__main__":
+    max_n = int(argv[1]) if len(argv) > 1 else 100_000
+    q = int(argv[2]) if len(argv) > 2 else 10_000
+
+    seed(0)
+    n = 1_000
+    while n <= max_n:
+        keys = sorted(randint(0, 2 ** 40) for _ in range(n))
+        queries = [randint(0, 2 ** 40) for _ in range(q)]
+        index = StaticSortedIndex(keys)
+
+        start = perf_counter()
+        expected = [bisect_right(keys, x) for x in queries]
+        plain = perf_counter() - start
+
+        start = perf_counter()
+        result = [index.bisect_right(x) for x in queries]
+        eytzinger = perf_counter() - start
+        assert result == expected
+
+        start = perf_counter()
+        result = [py_bisect_right(keys, x) for x in queries]
+        builtin = perf_counter() - start
+        assert result == expected
+
+        print(
+            f"n = {n:>10}: bisect_right {plain:.4f}s, "
+            f"StaticSortedIndex {eytzinger:.4f}s ({plain / eytzinger:.2f}x), "
+            f"bisect module {builtin:.4f}s"
+        )
+        n *= 10
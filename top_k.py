@@ -0,0 +1,148 @@
+"""
+Top-k selection
+https://www.wikiwand.com/en/Partial_sorting
+
+The k smallest (or largest) items of a stream are kept in a heap of size k
+whose root is the worst of them: a new item either loses against the root
+and is dropped, or replaces it with a single sift down.
+O(n log k) time, O(k) memory, the stream is consumed lazily.
+"""
+
+from heap import Heap
+
+
+KEY, INDEX, ITEM = 0, 1, 2
+
+
+class Descending:
+    """
+    wraps a comparable so that the order is reversed,
+    turning the min-heap.Heap into a max-heap
+    """
+    __slots__ = ("item",)
+
+    def __init__(self, item):
+        self.item = item
+
+    def __lt__(self, other):
+        return other.item < self.item
+
+
+class TopK:
+    """
+    bounded accumulator of the k smallest (or largest) items pushed so far,
+    ties are broken by arrival order as in sorted(...)[:k]
+    """
+
+    def __init__(self, k, key=lambda item: item, largest=False):
+        """
+        arguments:
+            k: number of items to keep
+            key: function applied to items to compare them, as in heap.Heap
+            largest: keep the k largest items instead of the k smallest
+        """
+        assert k >= 0
+        self.__k = k
+        self.__item_key = key
+        self.__largest = largest
+        self.__pushed = 0
+
+        # heap entries are (key, index, item) tuples, index is the arrival
+        # order (negated when keeping the largest items), so that the
+        # worst kept item sits at the root
+        if largest:
+            self.__heap = Heap(max_size=k)
+        else:
+            self.__heap = Heap(max_size=k, key=Descending)
+
+    def __len__(self):
+        return len(self.__heap)
+
+    def push(self, item):
+        """
+        returns:
+            whether the item is among the best k so far
+        """
+        k = self.__item_key(item)
+        i = self.__pushed
+        self.__pushed += 1
+
+        if len(self.__heap) < self.__k:
+            entry = (k, -i, item) if self.__largest else (k, i, item)
+            self.__heap.insert(name=i, value=entry)
+            return True
+        elif self.__k == 0:
+            return False
+
+        worst_key = self.__heap.get_root()[0][KEY]
+        if self.__largest and worst_key < k:
+            self.__heap.replace_root(name=i, value=(k, -i, item))
+            return True
+        elif not self.__largest and k < worst_key:
+            self.__heap.replace_root(name=i, value=(k, i, item))
+            return True
+        else:
+            return False
+
+    def extend(self, items):
+        for item in items:
+            self.push(item)
+
+    def result(self):
+        """
+        returns:
+            the kept items, best first
+        """
+        entries = [entry for _, entry in self.__heap.items()]
+        entries.sort(reverse=self.__largest)
+        return [entry[ITEM] for entry in entries]
+
+
+def nsmallest(k, items, key=lambda item: item):
+    """
+    returns:
+        the k smallest items of the iterable, same as sorted(items, key=key)[:k]
+    """
+    top = TopK(k, key=key)
+    top.extend(items)
+    return top.result()
+
+
+def nlargest(k, items, key=lambda item: item):
+    """
+    returns:
+        the k largest items of the iterable,
+        same as sorted(items, key=key, reverse=True)[:k]
+    """
+    top = TopK(k, key=key, largest=True)
+    top.extend(items)
+    return top.result()
+
+
+if __name__ == "__main__":
+    from random import randint
+
+    for _ in range(100):
+        arr = [randint(-50, 50) for _ in range(randint(0, 300))]
+        k = randint(0, 40)
+        assert nsmallest(k, arr) == sorted(arr)[:k]
+        assert nlargest(k, arr) == sorted(arr, reverse=True)[:k]
+
+    # stability, ties are broken by arrival order
+    def _key(task): return task[1]
+
+    tasks = [(i, randint(0, 5)) for i in range(200)]
+    assert nsmallest(10, tasks, key=_key) == sorted(tasks, key=_key)[:10]
+    assert nlargest(10, tasks, key=_key) == sorted(tasks, key=_key, reverse=True)[:10]
+
+    # generators are consumed lazily
+    assert nsmallest(3, (x * x % 1009 for x in range(10 ** 5))) == [0, 0, 0]
+    assert nlargest(2, iter("streaming")) == ["t", "s"]
+
+    top = TopK(2)
+    assert top.push(5) and top.push(3) and top.push(4)
+    assert not top.push(10)
+    assert len(top) == 2
+    assert top.result() == [3, 4]
+
+    print("all tests successful")
@@ -14,7 +14,7 @@ https://www.wikiwand.com/en/Dynamic_programming
 """
 
 from heapsort import heapsorted as sorted
-from binary_search import bisect_right
+from binary_search import bisect_batch
 
 
 START, END, WEIGHT = 0, 1, 2
@@ -39,15 +39,17 @@ class WIS:
 
         self.__tasks = sorted(tasks, key=lambda task: task[END])
 
-        # O(n log n)
+        # O(n log n) to order the starting times,
+        # then a single merge-walk against the finishing times
+        ends = [task[END] for task in self.__tasks]
+        starts = [task[START] for task in self.__tasks]
+        insertion_idxs = bisect_batch(ends, starts)
+
+        # tasks after j finish no earlier than j, so the search
+        # bounded by hi=j is the unbounded one capped at j
         self.__lcidx_mem = {0: None}
         for j in range(1, len(tasks)):
-            self.__lcidx_mem[j] = bisect_right(
-                self.__tasks,
-                self.__tasks[j][START],
-                hi=j,
-                key=lambda task: task[END]
-            ) - 1
+            self.__lcidx_mem[j] = min(insertion_idxs[j], j) - 1
             if self.__lcidx_mem[j] < 0:
                 self.__lcidx_mem[j] = None
 
@@ -169,4 +171,18 @@ if __name__ == "__main__":
     print(f"schedule: {wis.optimal_schedule_set()}")
     print(f"value: {wis.optimal_schedule_value}")
 
+    from random import randint
+    from binary_search import bisect_right
+
+    for _ in range(50):
+        tasks = []
+        for _ in range(randint(1, 100)):
+            start = randint(0, 100)
+            tasks.append((start, start + randint(0, 20), randint(1, 10)))
+        wis = WIS(tasks)
+        by_end = sorted(tasks, key=lambda task: task[END])
+        for j in range(1, len(tasks)):
+            i = bisect_right(by_end, by_end[j][START], hi=j, key=lambda task: task[END]) - 1
+            assert wis._latest_compatible_idx(j) == (i if i >= 0 else None)
+
     print("all tests successful")